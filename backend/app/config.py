@@ -136,9 +136,15 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 CHROMA_DIR = (BASE_DIR / "chroma_db")
 CHROMA_DIR.mkdir(parents=True, exist_ok=True)
 
+# On-disk cache of extracted document text (created by diskcache on first use)
+EXTRACTED_TEXT_CACHE_DIR = (BASE_DIR / "extracted_text_cache")
+
 # Database path
 DATABASE_PATH = BASE_DIR / "chat_history.db"
 
+# Last successful provider detection, reused on quick restarts
+PROVIDER_CACHE_PATH = BASE_DIR / ".provider_cache.json"
+
 # Upload limits
 MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "100"))
 MAX_UPLOAD_SIZE = MAX_UPLOAD_SIZE_MB * 1024 * 1024  # bytes
@@ -156,6 +162,14 @@ DEFAULT_OPENAI_EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-s
 DEFAULT_OLLAMA_LLM_MODEL = os.getenv("OLLAMA_LLM_MODEL", "llama2:latest")
 DEFAULT_OPENAI_LLM_MODEL = os.getenv("OPENAI_LLM_MODEL", "gpt-3.5-turbo")
 
+# Per-provider chat client tuning, applied when the client is built.
+# Local Ollama serves one or two generations at a time and is slow on CPU;
+# OpenAI takes far more parallel requests and its SDK retries 429s itself.
+PROVIDER_PROFILES = {
+    "ollama": {"max_concurrent": 2},
+    "openai": {"max_concurrent": 10, "timeout": 60.0, "max_retries": 2},
+}
+
 # OCR Configuration (Poppler path for pdf2image)
 POPPLER_PATH = os.getenv("POPPLER_PATH", r"D:\My Coding Projects\Poppler\poppler-25.07.0\Library\bin")
 
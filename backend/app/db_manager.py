@@ -5,8 +5,13 @@ Database engine and session management.
 Provides:
 - SQLite engine initialization
 - Session management with dependency injection
-- Table creation utilities
+- Read-only sessions for pure lookup endpoints
+- Table creation utilities (skipped when the schema is unchanged)
 """
+import hashlib
+
+from sqlalchemy import event, text
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import SQLModel, create_engine, Session
 from typing import Generator
 from app.config import DATABASE_PATH, logger
@@ -21,6 +26,37 @@ engine = create_engine(
 )
 
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+    # syncs at checkpoints instead of on every commit; journal_mode is stored
+    # in the database file, so the first connection switches it for good
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.close()
+
+
+# Separate engine whose connections refuse writes (PRAGMA query_only), so
+# read-only endpoints never take SQLite's write lock
+readonly_engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    echo=False
+)
+
+
+@event.listens_for(readonly_engine, "connect")
+def _set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 def create_db_and_tables():
     """
     Create all database tables defined in SQLModel.
@@ -34,6 +70,46 @@ def create_db_and_tables():
         raise
 
 
+def _schema_fingerprint() -> int:
+    """
+    Hash the DDL of every SQLModel table and index into a value that fits
+    SQLite's signed 32-bit PRAGMA user_version.
+    """
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(engine)))
+        # Indexes are separate statements; a new index=True must change the hash
+        ddl.extend(str(CreateIndex(index).compile(engine)) for index in table.indexes)
+    ddl.sort()
+    digest = hashlib.sha1("\n".join(ddl).encode("utf-8")).hexdigest()
+    return int(digest[:7], 16)
+
+
+def ensure_db_schema():
+    """
+    Create tables only if the models changed since the last boot.
+
+    The schema fingerprint is stored in PRAGMA user_version; a fresh or
+    deleted database reads back 0 and always gets the full create pass.
+    """
+    fingerprint = _schema_fingerprint()
+    with engine.connect() as conn:
+        stored = conn.execute(text("PRAGMA user_version")).scalar()
+    if stored == fingerprint:
+        logger.info(f"Database schema unchanged, skipping table creation: {DATABASE_PATH}")
+        return
+
+    create_db_and_tables()
+    # create_all only builds indexes along with a new table; add any that
+    # were declared on tables that already exist
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        conn.execute(text(f"PRAGMA user_version = {fingerprint}"))
+        conn.commit()
+
+
 def get_session() -> Generator[Session, None, None]:
     """
     Database session dependency for FastAPI.
@@ -51,6 +127,20 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+def get_readonly_session() -> Generator[Session, None, None]:
+    """
+    Read-only database session dependency for FastAPI.
+    
+    Any INSERT/UPDATE/DELETE issued through this session fails with
+    "attempt to write a readonly database".
+    
+    Yields:
+        Session: SQLModel database session bound to readonly_engine
+    """
+    with Session(readonly_engine, autoflush=False) as session:
+        yield session
+
+
 def get_db_stats(session: Session) -> dict:
     """
     Get database statistics for monitoring.
@@ -9,11 +9,14 @@ Architecture:
 """
 from typing import Dict, Any, List
 from pathlib import Path
+from collections import OrderedDict
 import logging
+import threading
 
 from fastapi.concurrency import run_in_threadpool
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document as LangChainDocument
+from langchain_core.embeddings import Embeddings
 
 from .config import CHROMA_DIR, PROVIDER, OLLAMA_HOST, OPENAI_API_KEY, DEFAULT_OLLAMA_EMBED_MODEL
 logger = logging.getLogger("chat_backend.embeddings")
@@ -37,6 +40,40 @@ except ImportError:
     Chroma = None
     logger.warning("chromadb/langchain-community not available. Install: pip install chromadb")
 
+class QueryCachingEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model with an in-process LRU cache for query embeddings.
+
+    Every RAG chat turn embeds the user's message; repeated questions are common,
+    so a hit skips the provider round-trip entirely. Document embeddings pass
+    straight through (uploads are rarely repeated and would evict queries).
+    """
+
+    def __init__(self, embeddings: Embeddings, maxsize: int = 4096):
+        self.embeddings = embeddings
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()  # Chroma calls run in the threadpool
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+                return vector
+
+        vector = self.embeddings.embed_query(text)
+
+        with self._lock:
+            self._cache[text] = vector
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return vector
+
+
 class LangChainEmbeddingManager:
     """
     Manages text embeddings and vector storage for RAG functionality.
@@ -49,7 +86,7 @@ class LangChainEmbeddingManager:
     
     def __init__(self, provider: str = "ollama"):
         self.provider = provider.lower()
-        self.embeddings = self._initialize_embeddings()
+        self.embeddings = QueryCachingEmbeddings(self._initialize_embeddings())
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=500,
             chunk_overlap=50,
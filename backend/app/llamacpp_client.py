@@ -15,10 +15,14 @@ from typing import List, Dict, Any, AsyncGenerator, Optional
 import logging
 from pathlib import Path
 import asyncio
+import threading
 from functools import partial
 
 logger = logging.getLogger("chat_backend.llamacpp_client")
 
+# Sentinel marking the end of a token stream handed over from the worker thread
+_STREAM_END = object()
+
 # Import llama-cpp-python with graceful error handling
 try:
     from llama_cpp import Llama
@@ -85,6 +89,9 @@ class LlamaCppClient:
         # Initialize models
         self._chat_llm = None
         self._embedding_llm = None
+        # Serializes the lazy chat model load (it runs in worker threads), so
+        # concurrent cold requests don't each load the GGUF
+        self._chat_llm_lock = threading.Lock()
         
         logger.info(
             f"LlamaCpp Client initialized:\n"
@@ -128,24 +135,29 @@ class LlamaCppClient:
         Returns:
             Initialized Llama instance for chat completions
         """
-        if self._chat_llm is None:
-            if not self.chat_model_path.exists():
-                raise FileNotFoundError(
-                    f"Chat model not found: {self.chat_model_path}\n"
-                    f"Run: python scripts/download_models.py"
+        llm = self._chat_llm
+        if llm is not None:
+            return llm
+        
+        with self._chat_llm_lock:
+            if self._chat_llm is None:
+                if not self.chat_model_path.exists():
+                    raise FileNotFoundError(
+                        f"Chat model not found: {self.chat_model_path}\n"
+                        f"Run: python scripts/download_models.py"
+                    )
+                
+                logger.info(f"Loading chat model: {self.chat_model_path}")
+                self._chat_llm = Llama(
+                    model_path=str(self.chat_model_path),
+                    n_ctx=self.n_ctx,
+                    n_gpu_layers=self.n_gpu_layers,
+                    verbose=self.verbose,
+                    n_threads=None,  # Auto-detect optimal threads
                 )
+                logger.info("Chat model loaded successfully")
             
-            logger.info(f"Loading chat model: {self.chat_model_path}")
-            self._chat_llm = Llama(
-                model_path=str(self.chat_model_path),
-                n_ctx=self.n_ctx,
-                n_gpu_layers=self.n_gpu_layers,
-                verbose=self.verbose,
-                n_threads=None,  # Auto-detect optimal threads
-            )
-            logger.info("Chat model loaded successfully")
-        
-        return self._chat_llm
+            return self._chat_llm
     
     def get_chat_llm(self) -> Llama:
         """
@@ -165,14 +177,15 @@ class LlamaCppClient:
         (swapping embedding models would invalidate stored vectors).
         """
         import gc
-        if self._chat_llm is not None:
-            logger.info(f"Unloading chat model: {self.chat_model_path.name}")
-            del self._chat_llm
-            self._chat_llm = None
-            gc.collect()
-            logger.info("Chat model unloaded from memory")
-        else:
-            logger.debug("unload() called but no chat model was loaded")
+        with self._chat_llm_lock:
+            if self._chat_llm is not None:
+                logger.info(f"Unloading chat model: {self.chat_model_path.name}")
+                del self._chat_llm
+                self._chat_llm = None
+                gc.collect()
+                logger.info("Chat model unloaded from memory")
+            else:
+                logger.debug("unload() called but no chat model was loaded")
 
     def _get_embedding_llm(self) -> Llama:
         """
@@ -256,19 +269,23 @@ class LlamaCppClient:
             Dict with 'token' (str) and 'done' (bool) keys
         """
         try:
-            llm = self._get_chat_llm()
+            # First call loads the GGUF from disk - keep that off the event loop too
+            llm = await asyncio.to_thread(self._get_chat_llm)
             
             # Format messages for llamacpp
             prompt = self._format_messages_for_llamacpp(messages)
             
             logger.debug(f"LlamaCpp params: temp={temperature}, top_p={top_p}, top_k={top_k}, max_tokens={max_tokens}")
             
-            # Run generation in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
+            # Generation runs start-to-finish in ONE worker thread, which hands
+            # tokens to the event loop through a queue (instead of one executor
+            # round-trip per token). `stop` lets a closed consumer end it early.
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            stop = threading.Event()
             
-            # Create generator in thread pool
             def generate_sync():
-                """Synchronous generator for llama.cpp"""
+                """Drive llama.cpp's synchronous token stream in a worker thread"""
                 try:
                     response_stream = llm(
                         prompt,
@@ -286,34 +303,37 @@ class LlamaCppClient:
                     )
                     
                     for chunk in response_stream:
+                        if stop.is_set():
+                            break
                         # Extract token from response
                         token = chunk.get("choices", [{}])[0].get("text", "")
                         if token:
-                            yield token
+                            loop.call_soon_threadsafe(queue.put_nowait, token)
+                    
+                    loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
                             
                 except Exception as e:
                     logger.exception("Generation failed in sync thread")
-                    raise
+                    loop.call_soon_threadsafe(queue.put_nowait, e)
             
-            # Stream tokens from thread pool
-            gen = generate_sync()
-            while True:
-                try:
-                    # Get next token from sync generator in thread pool
-                    token = await loop.run_in_executor(None, next, gen, None)
+            worker = loop.run_in_executor(None, generate_sync)
+            try:
+                while True:
+                    item = await queue.get()
                     
-                    if token is None:
-                        # Generator exhausted
+                    if item is _STREAM_END:
                         break
                     
-                    yield {"token": token, "done": False}
+                    if isinstance(item, Exception):
+                        yield {"token": "", "done": True, "error": str(item)}
+                        return
                     
-                except StopIteration:
-                    break
-                except Exception as e:
-                    logger.exception("Token streaming failed")
-                    yield {"token": "", "done": True, "error": str(e)}
-                    return
+                    yield {"token": item, "done": False}
+            finally:
+                # Stop generating if the consumer went away, and wait for the
+                # worker to let go of the model before another request uses it
+                stop.set()
+                await asyncio.shield(worker)
             
             # Send final done signal
             yield {"token": "", "done": True}
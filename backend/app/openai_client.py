@@ -8,9 +8,10 @@ Architecture:
 - Streaming: Both providers support streaming via SSE
 """
 from typing import List, Dict, Any, AsyncGenerator
+import asyncio
 import logging
 
-from .config import OPENAI_API_KEY, PROVIDER, OLLAMA_HOST, DEFAULT_OLLAMA_LLM_MODEL
+from .config import OPENAI_API_KEY, PROVIDER, OLLAMA_HOST, DEFAULT_OLLAMA_LLM_MODEL, PROVIDER_PROFILES
 
 logger = logging.getLogger("chat_backend.openai_client")
 
@@ -41,7 +42,7 @@ class EnhancedOpenAIClient:
     - done (bool): Whether generation is complete
     """
     
-    def __init__(self, base_url: str = None, api_key: str = None, provider: str = None):
+    def __init__(self, base_url: str = None, api_key: str = None, provider: str = None, profile: Dict[str, Any] = None):
         """
         Initialize client for the specified provider.
         
@@ -49,10 +50,15 @@ class EnhancedOpenAIClient:
             base_url: Ollama base URL (e.g., http://localhost:11434)
             api_key: OpenAI API key or "ollama" for local
             provider: Override provider detection ("ollama" or "openai")
+            profile: Tuning from PROVIDER_PROFILES (defaults to the provider's entry)
         """
         self.base_url = base_url
         self.api_key = api_key
         self.provider = provider or PROVIDER
+        self.profile = profile or PROVIDER_PROFILES.get(self.provider, {})
+        # Caps in-flight generations so extra requests queue here instead of
+        # piling onto the provider
+        self._slots = asyncio.Semaphore(self.profile.get("max_concurrent", 4))
         self.llm = self._initialize_llm()
         logger.info(f"LLM Client initialized with provider: {self.provider}")
 
@@ -89,7 +95,9 @@ class EnhancedOpenAIClient:
                 api_key=self.api_key or OPENAI_API_KEY,
                 model="gpt-3.5-turbo",
                 temperature=0.7,
-                max_tokens=2048
+                max_tokens=2048,
+                timeout=self.profile.get("timeout"),
+                max_retries=self.profile.get("max_retries", 2)
             )
         
         else:
@@ -142,21 +150,22 @@ class EnhancedOpenAIClient:
             elif hasattr(self.llm, 'num_predict'):
                 self.llm.num_predict = max_tokens  # Ollama uses num_predict
             
-            if stream:
-                # Use LangChain's astream method which yields AIMessageChunk objects
-                async for chunk in self.llm.astream(messages):
-                    # AIMessageChunk has a 'content' attribute with the token text
-                    token = chunk.content if hasattr(chunk, 'content') else str(chunk)
-                    if token:
-                        yield {"token": token, "done": False}
+            async with self._slots:
+                if stream:
+                    # Use LangChain's astream method which yields AIMessageChunk objects
+                    async for chunk in self.llm.astream(messages):
+                        # AIMessageChunk has a 'content' attribute with the token text
+                        token = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                        if token:
+                            yield {"token": token, "done": False}
                 
-                # Send final done signal
-                yield {"token": "", "done": True}
-            else:
-                # Non-streaming mode
-                response = await self.llm.ainvoke(messages)
-                content = response.content if hasattr(response, 'content') else str(response)
-                yield {"token": content, "done": True}
+                    # Send final done signal
+                    yield {"token": "", "done": True}
+                else:
+                    # Non-streaming mode
+                    response = await self.llm.ainvoke(messages)
+                    content = response.content if hasattr(response, 'content') else str(response)
+                    yield {"token": content, "done": True}
                 
         except Exception as e:
             logger.exception("Chat completion failed")
@@ -0,0 +1,21 @@
+# app/responses.py
+"""
+Custom response classes.
+
+Provides:
+- ORJSONResponse: JSON response rendered with orjson, for hot endpoints
+  that return plain dicts (large float lists, tight internal loops)
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib json module."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -3,8 +3,9 @@
 Chat streaming and conversation endpoints.
 Handles real-time chat with RAG context and memory integration.
 """
-import json
+import orjson
 import asyncio
+from contextlib import aclosing
 from datetime import datetime, timezone
 from fastapi import APIRouter, Body, Depends
 from fastapi.responses import StreamingResponse
@@ -18,6 +19,58 @@ from sqlmodel import select
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# Seconds of silence (e.g. slow prompt processing) before an SSE comment is sent
+# so proxies and the client don't treat the stream as stalled
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
+async def _with_keepalive(frames, interval: float = SSE_KEEPALIVE_INTERVAL):
+    """
+    Re-yield SSE frames, inserting a `: keep-alive` comment line whenever the
+    source has been idle for `interval` seconds. Comment lines are ignored by
+    SSE clients (the frontend only parses `data:` lines).
+
+    The source is iterated and closed by a single producer task feeding a
+    queue, so a client disconnect (which cancels the response task) never
+    closes the source while one of its steps is still running elsewhere.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    end = object()
+    failure = []
+
+    async def produce():
+        try:
+            async with aclosing(frames):
+                async for frame in frames:
+                    await queue.put(frame)
+        except Exception as exc:
+            failure.append(exc)
+        await queue.put(end)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), interval)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is end:
+                if failure:
+                    raise failure[0]
+                return
+            yield frame
+    finally:
+        # Cancelling the producer closes the source from inside its own task
+        # (aclosing); it finishes unwinding even if this await is interrupted
+        if not producer.done():
+            producer.cancel()
+            try:
+                await asyncio.shield(producer)
+            except asyncio.CancelledError:
+                pass
+
+
 class ChatRequest(BaseModel):
     chatId: str
     userId: str
@@ -42,7 +95,8 @@ async def chat_stream(
     """
     POST-only streaming chat endpoint.
     Body: JSON matching ChatRequest.
-    Returns SSE (text/event-stream) each line: data: {"token":"...","done":false}
+    Returns SSE (text/event-stream) each line: data: {"token":"..."}, ending with
+    a single data: {"token":"","done":true,"sources":[...]} frame
     
     Persistence:
     - Saves user message to SQLite before streaming
@@ -123,74 +177,85 @@ async def chat_stream(
                 logger.exception("Failed to save user message to database - continuing")
                 session.rollback()
             
-            # 1. Retrieve document context (RAG)
-            doc_context = ""
-            sources = []  # Track document sources for RAG attribution
-            if payload.searchMode in ["embeddings", "all"]:
-                try:
-                    logger.info(f"Querying ChromaDB for chat_id={payload.chatId}, searchMode={payload.searchMode}")
-                    search_results = await langchain_manager.search_documents(
-                        chat_id=payload.chatId, 
-                        query=payload.message, 
-                        k=3
-                    )
-                    if search_results:
-                        logger.info(f"Found {len(search_results)} RAG documents from ChromaDB")
-                        doc_context = "\n\n--- Relevant Documents ---\n"
-                        for result in search_results:
-                            doc_context += f"\n{result['content']}\n"
-                            filename = result['metadata'].get('filename', 'Unknown')
-                            doc_context += f"(Source: {filename})\n"
+            # 1-2. Retrieve document (RAG) and user memory context concurrently;
+            # the two lookups are independent, so total wait is the slower one
+            async def search_documents():
+                doc_context = ""
+                sources = []  # Track document sources for RAG attribution
+                if payload.searchMode in ["embeddings", "all"]:
+                    try:
+                        logger.info(f"Querying ChromaDB for chat_id={payload.chatId}, searchMode={payload.searchMode}")
+                        search_results = await langchain_manager.search_documents(
+                            chat_id=payload.chatId, 
+                            query=payload.message, 
+                            k=3
+                        )
+                        if search_results:
+                            logger.info(f"Found {len(search_results)} RAG documents from ChromaDB")
+                            doc_context = "\n\n--- Relevant Documents ---\n" + "".join(
+                                f"\n{result['content']}\n(Source: {result['metadata'].get('filename', 'Unknown')})\n"
+                                for result in search_results
+                            )
                             
                             # Track unique sources for attribution
-                            if filename not in [s['filename'] for s in sources]:
-                                sources.append({
-                                    'filename': filename,
-                                    'chatId': result['metadata'].get('chatId', payload.chatId),
-                                    'type': 'document'
-                                })
-                                logger.debug(f"Added document source: {filename}")
-                        logger.info(f"Document sources collected: {[s['filename'] for s in sources]}")
-                    else:
-                        logger.info("ChromaDB search returned no documents")
-                except Exception:
-                    logger.exception("Document search failed - continuing without RAG context")
-            else:
-                logger.info(f"Skipping ChromaDB query (searchMode={payload.searchMode})")
+                            seen_filenames = set()
+                            for result in search_results:
+                                filename = result['metadata'].get('filename', 'Unknown')
+                                if filename not in seen_filenames:
+                                    seen_filenames.add(filename)
+                                    sources.append({
+                                        'filename': filename,
+                                        'chatId': result['metadata'].get('chatId', payload.chatId),
+                                        'type': 'document'
+                                    })
+                                    logger.debug(f"Added document source: {filename}")
+                            logger.info(f"Document sources collected: {[s['filename'] for s in sources]}")
+                        else:
+                            logger.info("ChromaDB search returned no documents")
+                    except Exception:
+                        logger.exception("Document search failed - continuing without RAG context")
+                else:
+                    logger.info(f"Skipping ChromaDB query (searchMode={payload.searchMode})")
+                return doc_context, sources
 
-            # 2. Retrieve user memory context
-            mem0_context = ""
-            memory_used = False
-            if payload.useMemory:
-                try:
-                    logger.info(f"Querying Mem0 for user_id={payload.userId}")                 
-                    relevant_memories = await mem0_manager.search_memory(
-                        user_id=payload.userId,
-                        query=payload.message,
-                        limit=5
-                    )
+            async def search_memory():
+                mem0_context = ""
+                memory_used = False
+                if payload.useMemory:
+                    try:
+                        logger.info(f"Querying Mem0 for user_id={payload.userId}")                 
+                        relevant_memories = await mem0_manager.search_memory(
+                            user_id=payload.userId,
+                            query=payload.message,
+                            limit=5
+                        )
                     
-                    # mem0 returns {'results': [...]} wrapper
-                    memories_list = []
-                    if isinstance(relevant_memories, dict) and "results" in relevant_memories:
-                        memories_list = relevant_memories["results"]
-                    elif isinstance(relevant_memories, list):
-                        memories_list = relevant_memories
+                        # mem0 returns {'results': [...]} wrapper
+                        if isinstance(relevant_memories, dict):
+                            memories_list = relevant_memories.get("results") or []
+                        else:
+                            memories_list = relevant_memories if isinstance(relevant_memories, list) else []
                     
-                    if memories_list:
-                        logger.info(f"Found {len(memories_list)} Mem0 memories")
-                        mem0_context = "\n\n--- User Memory Context ---\n"
-                        for mem in memories_list:
-                            if isinstance(mem, dict) and "memory" in mem:
-                                mem0_context += f"- {mem['memory']}\n"
-                        logger.info(f"Memory context built: {mem0_context[:200]}")
-                        memory_used = True
-                    else:
-                        logger.info(f"Mem0 search returned no memories for user={payload.userId}")
-                except Exception:
-                    logger.exception("Memory search failed - continuing without memory context")
-            else:
-                logger.info(f"Skipping Mem0 query (useMemory={payload.useMemory})")
+                        if memories_list:
+                            logger.info(f"Found {len(memories_list)} Mem0 memories")
+                            mem0_context = "\n\n--- User Memory Context ---\n" + "".join(
+                                f"- {mem['memory']}\n"
+                                for mem in memories_list
+                                if isinstance(mem, dict) and "memory" in mem
+                            )
+                            logger.info(f"Memory context built: {mem0_context[:200]}")
+                            memory_used = True
+                        else:
+                            logger.info(f"Mem0 search returned no memories for user={payload.userId}")
+                    except Exception:
+                        logger.exception("Memory search failed - continuing without memory context")
+                else:
+                    logger.info(f"Skipping Mem0 query (useMemory={payload.useMemory})")
+                return mem0_context, memory_used
+
+            (doc_context, sources), (mem0_context, memory_used) = await asyncio.gather(
+                search_documents(), search_memory()
+            )
 
             # 3. Build conversation messages with context
             messages = [{"role": "system", "content": system_prompt}]
@@ -204,8 +269,12 @@ async def chat_stream(
             messages.append({"role": "user", "content": payload.message})
 
             # 4. Stream response tokens
+            # aclosing() shuts the provider stream down as soon as we stop
+            # iterating - on the done chunk or when the client disconnects -
+            # instead of leaving the upstream request to finish generating
             full_response = ""
-            async for chunk in openai_client.create_chat_completion(
+            stream_error = None
+            async with aclosing(openai_client.create_chat_completion(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -213,17 +282,20 @@ async def chat_stream(
                 top_p=top_p,
                 top_k=top_k,
                 stream=True
-            ):
-                # Chunk format: {"token": "...", "done": bool}
-                token = chunk.get("token", "")
-                full_response += token
-                
-                # Send SSE formatted data
-                sse_data = json.dumps(chunk)
-                yield f"data: {sse_data}\n\n"
-                
-                if chunk.get("done"):
-                    break
+            )) as completion:
+                async for chunk in completion:
+                    # Chunk format: {"token": "...", "done": bool}
+                    if chunk.get("done"):
+                        # Folded into the single final frame below
+                        full_response += chunk.get("token", "")
+                        stream_error = chunk.get("error")
+                        break
+                    
+                    token = chunk.get("token", "")
+                    full_response += token
+                    
+                    # Send SSE formatted data (intermediate frames carry only the token)
+                    yield f"data: {orjson.dumps({'token': token}).decode()}\n\n"
             
             # Add memory source if memories were used
             if memory_used:
@@ -233,13 +305,14 @@ async def chat_stream(
                     'type': 'memory'
                 })
             
-            # Send final event with sources
+            # Send the one terminal event, with sources and/or error attached
+            final_chunk = {"token": "", "done": True}
             if sources:
                 logger.info(f"Sending {len(sources)} sources: {sources}")
-                final_data = json.dumps({"token": "", "done": True, "sources": sources})
-                yield f"data: {final_data}\n\n"
-            else:
-                yield f"data: {json.dumps({'token': '', 'done': True})}\n\n"
+                final_chunk["sources"] = sources
+            if stream_error:
+                final_chunk["error"] = stream_error
+            yield f"data: {orjson.dumps(final_chunk).decode()}\n\n"
 
             # Log the accumulated response for debugging
             logger.info(f"Chat complete: user_message_length={len(payload.message)}, response_length={len(full_response)}, response_preview='{full_response[:100]}'")
@@ -252,7 +325,7 @@ async def chat_stream(
                     content=full_response,
                     search_mode=payload.searchMode,
                     model_used=model,  # Use loaded settings
-                    sources=json.dumps(sources) if sources else None  # Store sources as JSON
+                    sources=orjson.dumps(sources).decode() if sources else None  # Store sources as JSON
                 )
                 session.add(assistant_message)
                 session.commit()
@@ -326,11 +399,11 @@ async def chat_stream(
 
         except Exception as e:
             logger.exception("Chat streaming error")
-            error_data = json.dumps({"error": str(e), "done": True})
+            error_data = orjson.dumps({"error": str(e), "done": True}).decode()
             yield f"data: {error_data}\n\n"
 
     return StreamingResponse(
-        generate(), 
+        _with_keepalive(generate()), 
         media_type="text/event-stream", 
         headers={
             "Cache-Control": "no-cache",
@@ -6,6 +6,7 @@ Handles chat thread creation, retrieval, updates, and deletion.
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from sqlmodel import select, col
 from typing import List, Optional
+from contextlib import aclosing
 from datetime import datetime, timezone
 
 from app.database import Chat, ChatCreate, ChatResponse, ChatDetailResponse
@@ -60,17 +61,18 @@ Title:"""
         title_messages = [{"role": "user", "content": title_prompt}]
         full_title = ""
         
-        async for chunk in openai_client.create_chat_completion(
+        async with aclosing(openai_client.create_chat_completion(
             model=active_model,
             messages=title_messages,
             temperature=0.3,  # Low temperature for consistency
             max_tokens=20,    # Short title only
             stream=True
-        ):
-            if chunk.get("token"):
-                full_title += chunk["token"]
-            if chunk.get("done"):
-                break
+        )) as completion:
+            async for chunk in completion:
+                if chunk.get("token"):
+                    full_title += chunk["token"]
+                if chunk.get("done"):
+                    break
         
         # Clean and validate title
         title = full_title.strip().replace('"', '').replace("'", "")[:50]
@@ -3,22 +3,26 @@
 Dependency injection for shared managers and services.
 Provides centralized access to initialized managers across routes.
 """
-from typing import Annotated, Optional
-from fastapi import Depends
+from typing import TYPE_CHECKING, Annotated, Optional
+from fastapi import Depends, HTTPException, Request
 from sqlmodel import Session
 import logging
 
-from app.embeddings import LangChainEmbeddingManager
-from app.memory import Mem0MemoryManager
-from app.openai_client import EnhancedOpenAIClient
-from app.db_manager import get_session
+from app.db_manager import get_session, get_readonly_session
+
+# The manager modules pull in LangChain, ChromaDB and Mem0; they are only
+# needed for annotations here, and main.py imports them after the socket binds
+if TYPE_CHECKING:
+    from app.embeddings import LangChainEmbeddingManager
+    from app.memory import Mem0MemoryManager
+    from app.openai_client import EnhancedOpenAIClient
 
 logger = logging.getLogger("chat_backend.dependencies")
 
 # Global manager instances - initialized in main.py
-_langchain_manager: LangChainEmbeddingManager = None
-_mem0_manager: Mem0MemoryManager = None
-_openai_client: EnhancedOpenAIClient = None
+_langchain_manager: "LangChainEmbeddingManager" = None
+_mem0_manager: "Mem0MemoryManager" = None
+_openai_client: "EnhancedOpenAIClient" = None
 
 # LlamaCpp-specific instances (lazy-loaded)
 _llamacpp_client: Optional[object] = None
@@ -30,9 +34,9 @@ _started_with_llamacpp: bool = False
 
 
 def set_managers(
-    langchain_manager: LangChainEmbeddingManager,
-    mem0_manager: Mem0MemoryManager,
-    openai_client: EnhancedOpenAIClient
+    langchain_manager: "LangChainEmbeddingManager",
+    mem0_manager: "Mem0MemoryManager",
+    openai_client: "EnhancedOpenAIClient"
 ):
     """Initialize the global manager instances. Called from main.py."""
     global _langchain_manager, _mem0_manager, _openai_client, _started_with_llamacpp
@@ -43,7 +47,20 @@ def set_managers(
     _started_with_llamacpp = langchain_manager is None
 
 
-def get_langchain_manager() -> LangChainEmbeddingManager:
+def require_ready(request: Request) -> None:
+    """
+    Dependency rejecting requests with 503 until startup has initialized the
+    managers and database (see main._deferred_init).
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status_code=503,
+            detail="Backend is starting up",
+            headers={"Retry-After": "1"}
+        )
+
+
+def get_langchain_manager() -> "LangChainEmbeddingManager":
     """
     Dependency to get the embedding manager.
 
@@ -60,14 +77,14 @@ def get_langchain_manager() -> LangChainEmbeddingManager:
     return _langchain_manager
 
 
-def get_mem0_manager() -> Mem0MemoryManager:
+def get_mem0_manager() -> "Mem0MemoryManager":
     """Dependency to get the Mem0 memory manager."""
     if _mem0_manager is None:
         raise RuntimeError("Mem0 manager not initialized")
     return _mem0_manager
 
 
-def get_openai_client() -> EnhancedOpenAIClient:
+def get_openai_client() -> "EnhancedOpenAIClient":
     """
     Dependency to get the LLM client based on the *current* chat provider.
 
@@ -183,7 +200,8 @@ def get_llamacpp_embedding_manager():
 
 
 # Type aliases for cleaner dependency injection
-LangChainManager = Annotated[LangChainEmbeddingManager, Depends(get_langchain_manager)]
-Mem0Manager = Annotated[Mem0MemoryManager, Depends(get_mem0_manager)]
-OpenAIClient = Annotated[EnhancedOpenAIClient, Depends(get_openai_client)]
+LangChainManager = Annotated["LangChainEmbeddingManager", Depends(get_langchain_manager)]
+Mem0Manager = Annotated["Mem0MemoryManager", Depends(get_mem0_manager)]
+OpenAIClient = Annotated["EnhancedOpenAIClient", Depends(get_openai_client)]
 DBSession = Annotated[Session, Depends(get_session)]
+ReadOnlyDBSession = Annotated[Session, Depends(get_readonly_session)]
@@ -4,7 +4,7 @@ Document upload and RAG (Retrieval-Augmented Generation) endpoints.
 Handles file uploads, text extraction (with OCR/JSON support), embedding generation, and vector storage.
 """
 import uuid
-import json
+import orjson
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -12,7 +12,6 @@ from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 from fastapi.responses import StreamingResponse
 from sqlmodel import select
 from fastapi.concurrency import run_in_threadpool
-from langchain_core.documents import Document as LangChainDocument
 from app.config import UPLOAD_DIR, MAX_UPLOAD_SIZE, logger
 from app.utils import extract_text_from_file
 from app.schemas import UploadResponse
@@ -72,7 +71,7 @@ async def upload_document(
 
         # 3. Extract text content (with OCR and JSON support)
         try:
-            text_content = extract_text_from_file(file_path, file.content_type)
+            text_content = await extract_text_from_file(file_path, file.content_type)
         except Exception as e:
             # Clean up file on extraction failure
             if file_path.exists():
@@ -221,14 +220,14 @@ async def upload_document_stream(
         file_path = None
         try:
             # Stage 1: Upload initiated
-            yield f"data: {json.dumps({'stage': 'uploading', 'progress': 0})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'uploading', 'progress': 0}).decode()}\n\n"
             
             # Read and validate file size
             content = await file.read()
             size = len(content)
             
             if size > MAX_UPLOAD_SIZE:
-                yield f"data: {json.dumps({'stage': 'error', 'error': f'File too large. Maximum: {MAX_UPLOAD_SIZE} bytes'})}\n\n"
+                yield f"data: {orjson.dumps({'stage': 'error', 'error': f'File too large. Maximum: {MAX_UPLOAD_SIZE} bytes'}).decode()}\n\n"
                 return
             
             # Save file temporarily
@@ -238,22 +237,22 @@ async def upload_document_stream(
             file_path.write_bytes(content)
             
             # Stage 2: Upload complete
-            yield f"data: {json.dumps({'stage': 'uploaded', 'progress': 20})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'uploaded', 'progress': 20}).decode()}\n\n"
             
             # Stage 3: Text extraction
-            yield f"data: {json.dumps({'stage': 'extracting', 'progress': 20})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'extracting', 'progress': 20}).decode()}\n\n"
             
             try:
-                text_content = extract_text_from_file(file_path, file.content_type)
+                text_content = await extract_text_from_file(file_path, file.content_type)
             except Exception as e:
                 logger.exception("Text extraction failed")
                 if file_path and file_path.exists():
                     file_path.unlink()
-                yield f"data: {json.dumps({'stage': 'error', 'error': f'Text extraction failed: {str(e)}'})}\n\n"
+                yield f"data: {orjson.dumps({'stage': 'error', 'error': f'Text extraction failed: {str(e)}'}).decode()}\n\n"
                 return
             
             # Stage 4: Extraction complete
-            yield f"data: {json.dumps({'stage': 'extracted', 'progress': 40})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'extracted', 'progress': 40}).decode()}\n\n"
             
             # Verify/create chat and user
             from app.database import Chat, User
@@ -278,23 +277,27 @@ async def upload_document_stream(
                 logger.info(f"Created chat: {chatId}")
             
             # Stage 5: Chunking
-            yield f"data: {json.dumps({'stage': 'chunking', 'progress': 40})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'chunking', 'progress': 40}).decode()}\n\n"
             
             # Split text into chunks
             chunks = langchain_manager.text_splitter.split_text(text_content)
             total_chunks = len(chunks)
             
             # Stage 6: Chunking complete
-            yield f"data: {json.dumps({'stage': 'chunking_complete', 'progress': 50, 'total_chunks': total_chunks})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'chunking_complete', 'progress': 50, 'total_chunks': total_chunks}).decode()}\n\n"
             
             # Stage 7: Embedding with progress updates
-            yield f"data: {json.dumps({'stage': 'embedding', 'progress': 50, 'current_chunk': 0, 'total_chunks': total_chunks})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'embedding', 'progress': 50, 'current_chunk': 0, 'total_chunks': total_chunks}).decode()}\n\n"
             
+            from langchain_core.documents import Document as LangChainDocument
+
             # Create vectorstore
             vectorstore = await run_in_threadpool(langchain_manager.create_vectorstore, chatId)
             
             # Process chunks in batches to provide progress updates
-            batch_size = 10  # Embed 10 chunks at a time
+            # Each add_documents call is one batched embed request (Ollama /api/embed),
+            # so larger batches mean fewer round-trips; 64 still gives regular progress
+            batch_size = 64
             for i in range(0, total_chunks, batch_size):
                 batch = chunks[i:i+batch_size]
                 documents = [
@@ -317,7 +320,7 @@ async def upload_document_stream(
                 current_chunk = min(i + len(batch), total_chunks)
                 progress = 50 + int((current_chunk / total_chunks) * 45)
                 
-                yield f"data: {json.dumps({'stage': 'embedding', 'progress': progress, 'current_chunk': current_chunk, 'total_chunks': total_chunks})}\n\n"
+                yield f"data: {orjson.dumps({'stage': 'embedding', 'progress': progress, 'current_chunk': current_chunk, 'total_chunks': total_chunks}).decode()}\n\n"
             
             # Persist vectorstore
             await run_in_threadpool(vectorstore.persist)
@@ -349,14 +352,14 @@ async def upload_document_stream(
                 logger.info(f"Cleaned up temporary file: {file_path}")
             
             # Stage 8: Ready
-            yield f"data: {json.dumps({'stage': 'ready', 'progress': 100, 'document': {'id': file_id, 'name': file.filename, 'size': size, 'uploadedAt': datetime.now(timezone.utc).isoformat(), 'contentType': file.content_type, 'chunks': total_chunks}})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'ready', 'progress': 100, 'document': {'id': file_id, 'name': file.filename, 'size': size, 'uploadedAt': datetime.now(timezone.utc).isoformat(), 'contentType': file.content_type, 'chunks': total_chunks}}).decode()}\n\n"
             
         except HTTPException as e:
             logger.exception("Upload streaming failed with HTTPException")
-            yield f"data: {json.dumps({'stage': 'error', 'error': e.detail})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'error', 'error': e.detail}).decode()}\n\n"
         except Exception as e:
             logger.exception("Upload streaming failed")
-            yield f"data: {json.dumps({'stage': 'error', 'error': str(e)})}\n\n"
+            yield f"data: {orjson.dumps({'stage': 'error', 'error': str(e)}).decode()}\n\n"
             # Clean up on error
             if file_path and file_path.exists():
                 try:
@@ -3,57 +3,174 @@
 Health check and system status endpoints.
 Provides monitoring and diagnostics for system components.
 """
+import os
 import re
-import httpx
-from fastapi import APIRouter, Request
-from app.config import PROVIDER, DATABASE_PATH, logger, LLAMACPP_MODELS_DIR, DEFAULT_OLLAMA_LLM_MODEL, DEFAULT_OPENAI_LLM_MODEL, OLLAMA_HOST, runtime_config
+import time
+import asyncio
+from functools import lru_cache
+import orjson
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from app.config import PROVIDER, DATABASE_PATH, logger, LLAMACPP_MODELS_DIR, DEFAULT_OLLAMA_LLM_MODEL, DEFAULT_OPENAI_LLM_MODEL, runtime_config
 from app.schemas import HealthResponse
-from .dependencies import LangChainManager, DBSession
+from .dependencies import LangChainManager, DBSession, require_ready
 from app.db_manager import get_db_stats
 
 router = APIRouter(prefix="/api", tags=["health"])
 
 MIN_PARAMS_FOR_MEMORY = 1.5  # Billion
 
+# GGUF directory listing cache for /api/models (frontends poll this endpoint)
+_MODELS_CACHE_TTL = 30.0  # seconds
+_models_cache = {"ts": 0.0, "mtime": 0.0, "value": []}
+
+# Ollama /api/tags cache; the lock coalesces concurrent misses into one upstream call
+_OLLAMA_TAGS_TTL = 30.0  # seconds
+_ollama_tags_cache = {"ts": 0.0, "value": None}
+_ollama_tags_lock = asyncio.Lock()
+
+# Database statistics cache for /health (liveness probes poll it frequently)
+_DB_STATS_TTL = 5.0  # seconds
+_db_stats_cache = {"ts": 0.0, "value": None}
+
+# Known model families whose names carry no explicit size suffix
+_KNOWN_MODEL_FAMILIES = {
+    "tinyllama": 1.1, "phi-2": 2.7, "phi2": 2.7,
+    "phi-3-mini": 3.8, "phi3:mini": 3.8,
+    "llama2": 7.0, "llama3": 8.0, "mistral": 7.0,
+    "gemma:2b": 2.0, "gemma2:2b": 2.0, "gemma:7b": 7.0,
+    "gpt-3.5": 20.0, "gpt-4": 1000.0,
+}
+
+# Single alternation over all family keys, built once at import time so the
+# fallback is one linear scan of the name instead of one substring search per key.
+# Longer keys come first so overlapping families resolve to the most specific one.
+_KNOWN_FAMILY_RE = re.compile(
+    "|".join(re.escape(key) for key in sorted(_KNOWN_MODEL_FAMILIES, key=len, reverse=True))
+)
+
+# Parameter-size patterns, compiled once (the estimator runs per candidate
+# inside sort keys):
+# - common size suffixes: 0.5b, 1.5b, 7b, 70b (qwen2.5-1.5b-q4, llama-3-8b-instruct.gguf)
+# - fallback: bare number followed by 'b' anywhere
+# - millions: 500m → 0.5
+_RE_DASH_B = re.compile(r'[-_](\d+\.?\d*)b(?:[qiQ_\-.]|$)')
+_RE_B = re.compile(r'(\d+\.?\d*)b(?:[^a-z]|$)')
+_RE_M = re.compile(r'(\d+)m(?:[^a-z]|$)')
+
 def estimate_model_params_billions(model_name: str) -> float:
     """
     Estimate model parameter count in billions from the model filename/name.
     Returns 0.0 if unknown (caller treats 0.0 as 'unknown, allow memory').
     """
-    name = model_name.lower()
+    return _estimate_params_normalized(model_name.casefold())
 
-    # Parse common size patterns: 0.5b, 0.6b, 1.5b, 3b, 7b, 13b, 70b, 72b, 1.5B
-    # Also handles: qwen2.5-1.5b-q4, llama-3-8b-instruct.gguf, etc.
-    match = re.search(r'[-_](\d+\.?\d*)b(?:[qiQ_\-.]|$)', name)
-    if match:
-        return float(match.group(1))
 
-    # Fallback: bare number followed by 'b' anywhere
-    match = re.search(r'(\d+\.?\d*)b(?:[^a-z]|$)', name)
+@lru_cache(maxsize=512)
+def _estimate_params_normalized(name: str) -> float:
+    """Estimate for an already case-folded name (family keys are lowercase)."""
+    match = _RE_DASH_B.search(name) or _RE_B.search(name)
     if match:
         return float(match.group(1))
 
-    # Millions: 500m → 0.5
-    match = re.search(r'(\d+)m(?:[^a-z]|$)', name)
+    match = _RE_M.search(name)
     if match:
         return float(match.group(1)) / 1000.0
 
     # Known model families
-    known = {
-        "tinyllama": 1.1, "phi-2": 2.7, "phi2": 2.7,
-        "phi-3-mini": 3.8, "phi3:mini": 3.8,
-        "llama2": 7.0, "llama3": 8.0, "mistral": 7.0,
-        "gemma:2b": 2.0, "gemma2:2b": 2.0, "gemma:7b": 7.0,
-        "gpt-3.5": 20.0, "gpt-4": 1000.0,
-    }
-    for key, size in known.items():
-        if key in name:
-            return size
+    match = _KNOWN_FAMILY_RE.search(name)
+    if match:
+        return _KNOWN_MODEL_FAMILIES[match.group(0)]
 
     return 0.0  # Unknown
 
 
-@router.get("/health", response_model=HealthResponse)
+def list_gguf_models() -> list:
+    """
+    Return sorted .gguf filenames in LLAMACPP_MODELS_DIR.
+
+    The listing is cached and only rescanned when the directory mtime changes
+    (a file was added, removed or renamed) or the TTL expires, so polling
+    clients cost one stat() instead of a full directory walk.
+    """
+    mtime = LLAMACPP_MODELS_DIR.stat().st_mtime
+    now = time.monotonic()
+    if mtime == _models_cache["mtime"] and now - _models_cache["ts"] < _MODELS_CACHE_TTL:
+        return _models_cache["value"]
+
+    # scandir yields DirEntry objects with cached type info: no Path per entry, no fnmatch
+    with os.scandir(LLAMACPP_MODELS_DIR) as entries:
+        models = sorted(e.name for e in entries if e.is_file() and e.name.endswith(".gguf"))
+    _models_cache.update(ts=now, mtime=mtime, value=models)
+    return models
+
+
+async def fetch_ollama_tags(client, max_age: float = _OLLAMA_TAGS_TTL) -> list:
+    """
+    Return Ollama model names, served from a short-lived cache.
+
+    `max_age` lets callers that need fresher data (model switching) accept a
+    shorter staleness window than the listing endpoint. Only successful
+    responses are cached; failures propagate to the caller.
+    """
+    if _ollama_tags_cache["value"] is not None and time.monotonic() - _ollama_tags_cache["ts"] < max_age:
+        return _ollama_tags_cache["value"]
+
+    async with _ollama_tags_lock:
+        # Another request may have refreshed the cache while we waited for the lock
+        if _ollama_tags_cache["value"] is not None and time.monotonic() - _ollama_tags_cache["ts"] < max_age:
+            return _ollama_tags_cache["value"]
+
+        resp = await client.get("/api/tags")
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        models = [m["name"] for m in data.get("models", [])]
+        _ollama_tags_cache.update(ts=time.monotonic(), value=models)
+        return models
+
+
+def _get_cached_db_stats(session) -> dict:
+    """
+    Return table counts, refreshed at most once per _DB_STATS_TTL.
+
+    The refresh runs synchronously with no await point, so concurrent probes
+    on the event loop cannot interleave and a single query serves them all.
+    Error results are not cached.
+    """
+    now = time.monotonic()
+    if _db_stats_cache["value"] is not None and now - _db_stats_cache["ts"] < _DB_STATS_TTL:
+        return _db_stats_cache["value"]
+
+    stats = get_db_stats(session)
+    if "error" not in stats:
+        _db_stats_cache.update(ts=now, value=stats)
+    return stats
+
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness probe: the server process is up and accepting connections."""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness(request: Request):
+    """
+    Readiness probe: 503 until deferred startup has initialized the managers.
+    Includes the failure message if initialization raised.
+    """
+    if getattr(request.app.state, "ready", False):
+        return {"ready": True}
+    content = {"ready": False}
+    failure = getattr(request.app.state, "startup_failure", None)
+    if failure:
+        content["error"] = failure
+    return JSONResponse(content, status_code=503)
+
+
+# The remaining routes read managers and detection results, so they wait for
+# startup; Electron polls /health until it stops answering 503
+@router.get("/health", response_model=HealthResponse, dependencies=[Depends(require_ready)])
 async def health_check(
     request: Request,
     langchain_manager: LangChainManager,
@@ -72,34 +189,39 @@ async def health_check(
     Returns detailed component status for monitoring.
     """
     try:
-        # Test database connection and get stats
-        db_stats = get_db_stats(session)
-        db_healthy = "error" not in db_stats
-        
         # Get startup errors from app state
         startup_errors = getattr(request.app.state, 'startup_errors', [])
-        has_warnings = len(startup_errors) > 0
         
         components = {
-            "database": db_healthy,
             "database_path": str(DATABASE_PATH),
-            "database_stats": db_stats,
             "langchain_embeddings": langchain_manager is not None,  # Check manager exists
             "mem0_memory": True,  # Always available (has fallback implementation)
             "vectorstore": True   # ChromaDB is file-based, always available
         }
         
-        # Add startup validation results
-        if has_warnings:
+        # Fast path: startup validation already marks the system degraded,
+        # so skip the database queries entirely
+        if startup_errors:
             components["startup_validation"] = {
                 "passed": False,
                 "warnings": startup_errors
             }
-        else:
-            components["startup_validation"] = {"passed": True}
+            return {
+                "status": "degraded",
+                "provider": PROVIDER,
+                "components": components
+            }
+        
+        # Test database connection and get stats
+        db_stats = _get_cached_db_stats(session)
+        db_healthy = "error" not in db_stats
+        
+        components["database"] = db_healthy
+        components["database_stats"] = db_stats
+        components["startup_validation"] = {"passed": True}
         
         return {
-            "status": "healthy" if (db_healthy and not has_warnings) else "degraded",
+            "status": "healthy" if db_healthy else "degraded",
             "provider": PROVIDER,
             "components": components
         }
@@ -112,7 +234,7 @@ async def health_check(
         }
 
 
-@router.get("/capabilities")
+@router.get("/capabilities", dependencies=[Depends(require_ready)])
 async def get_capabilities(request: Request):
     """
     Get system capabilities including GPU support for LlamaCpp.
@@ -172,8 +294,8 @@ async def get_capabilities(request: Request):
     return capabilities
 
 
-@router.get("/models")
-async def get_available_models():
+@router.get("/models", dependencies=[Depends(require_ready)])
+async def get_available_models(request: Request):
     """
     Return list of available models for the current provider.
     - LlamaCpp: scans LLAMACPP_MODELS_DIR for .gguf files
@@ -184,8 +306,7 @@ async def get_available_models():
     provider = runtime_config.provider
     if provider == "llamacpp":
         try:
-            gguf_files = sorted(LLAMACPP_MODELS_DIR.glob("*.gguf"))
-            models = [f.name for f in gguf_files]
+            models = await asyncio.to_thread(list_gguf_models)
         except Exception as e:
             logger.warning(f"Failed to scan models dir: {e}")
             models = []
@@ -197,11 +318,7 @@ async def get_available_models():
 
     elif provider == "ollama":
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{OLLAMA_HOST}/api/tags")
-                resp.raise_for_status()
-                data = resp.json()
-                models = [m["name"] for m in data.get("models", [])]
+            models = await fetch_ollama_tags(request.app.state.ollama_client)
         except Exception as e:
             logger.warning(f"Failed to fetch Ollama models: {e}")
             models = [DEFAULT_OLLAMA_LLM_MODEL]
@@ -10,12 +10,95 @@ Only exposed internally - not registered with FastAPI app by default.
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import logging
+import time
+
+from app.responses import ORJSONResponse
 
 logger = logging.getLogger("chat_backend.llamacpp_api")
 
 router = APIRouter(prefix="/v1", tags=["llamacpp-internal"])
 
+# Embedding micro-batcher: Mem0 fires many single-text embedding calls in
+# quick succession, so concurrent requests arriving within a short window
+# are merged into one llama.cpp call and the results fanned back out.
+_EMBED_BATCH_WINDOW = 0.01  # seconds
+_embed_queue: Optional[asyncio.Queue] = None
+_embed_batcher_task: Optional[asyncio.Task] = None
+
+
+async def _embed_batcher():
+    """Drain queued embedding requests every window and embed them together."""
+    from app.routes.dependencies import get_llamacpp_client
+    
+    while True:
+        batch = [await _embed_queue.get()]
+        all_texts = []
+        try:
+            await asyncio.sleep(_EMBED_BATCH_WINDOW)
+            while not _embed_queue.empty():
+                batch.append(_embed_queue.get_nowait())
+            
+            all_texts = [text for texts, _ in batch for text in texts]
+            llamacpp_client = get_llamacpp_client()
+            if llamacpp_client is None:
+                raise HTTPException(status_code=503, detail="LlamaCpp client not initialized")
+            embeddings = await llamacpp_client.create_embeddings(all_texts)
+        except asyncio.CancelledError:
+            # Shutting down: callers of the batch in hand must not wait forever
+            _fail_futures(batch, RuntimeError("Embedding batcher stopped"))
+            raise
+        except Exception as e:
+            _fail_futures(batch, e)
+            continue
+        
+        # Resolve each caller's future with its slice of the batch
+        start = 0
+        for texts, future in batch:
+            end = start + len(texts)
+            if not future.done():
+                future.set_result(embeddings[start:end])
+            start = end
+
+
+def _fail_futures(batch, exc: BaseException) -> None:
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(exc)
+
+
+async def stop_embed_batcher() -> None:
+    """
+    Cancel the micro-batcher task and fail any still-queued requests.
+    Called from the app lifespan shutdown.
+    """
+    global _embed_queue, _embed_batcher_task
+    
+    task, queue = _embed_batcher_task, _embed_queue
+    _embed_batcher_task = _embed_queue = None
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    if queue is not None:
+        queued = []
+        while not queue.empty():
+            queued.append(queue.get_nowait())
+        _fail_futures(queued, RuntimeError("Embedding batcher stopped"))
+
+
+async def _batched_embeddings(texts: List[str]) -> List[List[float]]:
+    """Queue texts for the micro-batcher and wait for their embeddings."""
+    global _embed_queue, _embed_batcher_task
+    
+    if _embed_batcher_task is None or _embed_batcher_task.done():
+        _embed_queue = asyncio.Queue()
+        _embed_batcher_task = asyncio.create_task(_embed_batcher())
+    
+    future = asyncio.get_running_loop().create_future()
+    await _embed_queue.put((texts, future))
+    return await future
+
 
 class CompletionRequest(BaseModel):
     """OpenAI-compatible completion request"""
@@ -62,7 +145,11 @@ class EmbeddingResponse(BaseModel):
     model: str
 
 
-@router.post("/completions", response_model=CompletionResponse)
+@router.post(
+    "/completions",
+    response_class=ORJSONResponse,
+    responses={200: {"model": CompletionResponse}},
+)
 async def create_completion(request: CompletionRequest):
     """
     OpenAI-compatible completions endpoint using llamacpp.
@@ -99,26 +186,27 @@ async def create_completion(request: CompletionRequest):
         # Extract completion text
         text = response.get("choices", [{}])[0].get("text", "")
         
-        import time
-        return CompletionResponse(
-            id=f"cmpl-{int(time.time())}",
-            created=int(time.time()),
-            model="llamacpp",
-            choices=[
-                CompletionChoice(
-                    text=text,
-                    index=0,
-                    finish_reason="stop"
-                )
-            ]
-        )
+        now = int(time.time())
+        return ORJSONResponse(content={
+            "id": f"cmpl-{now}",
+            "object": "text_completion",
+            "created": now,
+            "model": "llamacpp",
+            "choices": [
+                {"text": text, "index": 0, "finish_reason": "stop"}
+            ],
+        })
         
     except Exception as e:
         logger.exception("Completion request failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/embeddings", response_model=EmbeddingResponse)
+@router.post(
+    "/embeddings",
+    response_class=ORJSONResponse,
+    responses={200: {"model": EmbeddingResponse}},
+)
 async def create_embeddings(request: EmbeddingRequest):
     """
     OpenAI-compatible embeddings endpoint using llamacpp.
@@ -126,31 +214,22 @@ async def create_embeddings(request: EmbeddingRequest):
     Used internally by Mem0 custom provider registration.
     """
     try:
-        from app.routes.dependencies import get_llamacpp_client
-        
-        llamacpp_client = get_llamacpp_client()
-        if llamacpp_client is None:
-            raise HTTPException(status_code=503, detail="LlamaCpp client not initialized")
-        
         # Handle single string or list
         texts = [request.input] if isinstance(request.input, str) else request.input
         
-        # Get embeddings
-        embeddings = await llamacpp_client.create_embeddings(texts)
-        
-        # Format response
-        data = [
-            EmbeddingData(
-                embedding=emb,
-                index=idx
-            )
-            for idx, emb in enumerate(embeddings)
-        ]
+        # Get embeddings (coalesced with concurrent requests)
+        embeddings = await _batched_embeddings(texts)
         
-        return EmbeddingResponse(
-            data=data,
-            model="llamacpp-embed"
-        )
+        # Format response as a plain dict; per-item Pydantic validation of
+        # large float lists dominates otherwise
+        return ORJSONResponse(content={
+            "object": "list",
+            "data": [
+                {"object": "embedding", "embedding": emb, "index": idx}
+                for idx, emb in enumerate(embeddings)
+            ],
+            "model": "llamacpp-embed",
+        })
         
     except Exception as e:
         logger.exception("Embedding request failed")
@@ -5,20 +5,20 @@ Model management endpoints.
 Handles listing available models and switching the active provider/model at
 runtime without requiring a backend restart.
 """
-import re
 import asyncio
 import logging
-import subprocess
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlmodel import select
+from sqlmodel import select, update
 from datetime import datetime, timezone
 
+import app.config as config_module
 from app.config import (
     PROVIDER,
     OLLAMA_HOST,
+    OPENAI_API_KEY,
     LLAMACPP_MODELS_DIR,
     LLAMACPP_EMBED_MODEL,
     LLAMACPP_ENABLE_PARALLEL,
@@ -30,33 +30,29 @@ from app.config import (
     runtime_config,
     logger,
 )
-from .dependencies import DBSession
+from app.database import UserSettings
+from .dependencies import (
+    DBSession,
+    get_llamacpp_client,
+    set_llamacpp_client,
+    set_openai_client,
+)
+from app.utils import start_ollama_server
+from .health import estimate_model_params_billions, fetch_ollama_tags, list_gguf_models
 
 router = APIRouter(prefix="/api/models", tags=["models"])
 
+# Guards the unload → build → set_*_client sequence in switch_model
+_switch_lock = asyncio.Lock()
+
+# Maximum age of the cached Ollama tag list accepted by switch_model (seconds)
+_OLLAMA_SWITCH_TAGS_MAX_AGE = 5.0
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-def _estimate_params_billions(model_name: str) -> float:
-    """
-    Estimate parameter count in billions from a model filename or tag name.
-    Returns 0.0 if unknown (treated as 'large enough' by callers).
-    """
-    name = model_name.lower()
-    match = re.search(r'[-_](\d+\.?\d*)b(?:[qiQ_\-.]|$)', name)
-    if match:
-        return float(match.group(1))
-    match = re.search(r'(\d+\.?\d*)b(?:[^a-z]|$)', name)
-    if match:
-        return float(match.group(1))
-    match = re.search(r'(\d+)m(?:[^a-z]|$)', name)
-    if match:
-        return float(match.group(1)) / 1000.0
-    return 0.0
-
-
 def _pick_best_model(available: List[str], preferred: Optional[str]) -> Optional[str]:
     """
     Return the best model to activate from `available`.
@@ -72,66 +68,51 @@ def _pick_best_model(available: List[str], preferred: Optional[str]) -> Optional
     if preferred and preferred in available:
         return preferred
 
-    # Sort by estimated params (ascending), fall back to name
+    if len(available) == 1:
+        return available[0]
+
+    # Smallest by estimated params, fall back to name (min: one pass, no list copy)
     def sort_key(name):
-        p = _estimate_params_billions(name)
+        p = estimate_model_params_billions(name)
         return (p if p > 0 else float('inf'), name)
 
-    return sorted(available, key=sort_key)[0]
+    return min(available, key=sort_key)
 
 
-async def _is_ollama_reachable() -> bool:
+async def _is_ollama_reachable(client: httpx.AsyncClient) -> bool:
     """Return True if Ollama is currently reachable."""
     try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            resp = await client.get(f"{OLLAMA_HOST}/api/tags")
-            return resp.status_code == 200
+        # /api/version returns a tiny body; /api/tags would serialize every model
+        resp = await client.get("/api/version", timeout=3.0)
+        return resp.status_code == 200
     except Exception:
         return False
 
 
-async def _ensure_ollama_running() -> bool:
+async def _ensure_ollama_running(app: FastAPI) -> bool:
     """
-    Check if Ollama is reachable; if not, attempt to start it via `ollama serve`.
+    Check if Ollama is reachable; if not, start it with the same
+    `ollama serve` spawn used at startup (app.utils.start_ollama_server).
     Returns True if Ollama is reachable after attempts, False otherwise.
     """
-    if await _is_ollama_reachable():
+    if await _is_ollama_reachable(app.state.ollama_client):
         return True
 
     logger.info("Ollama not reachable — attempting to start 'ollama serve'...")
-    try:
-        subprocess.Popen(
-            ["ollama", "serve"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),  # Windows: no console
-        )
-    except FileNotFoundError:
-        logger.warning("'ollama' executable not found in PATH — is Ollama installed?")
-        return False
-    except Exception as exc:
-        logger.warning(f"Failed to spawn 'ollama serve': {exc}")
-        return False
+    result = await start_ollama_server()
+    if result["process"] is not None:
+        # Stopped on shutdown like a server started during provider detection
+        app.state.ollama_process = result["process"]
+    if result["error"]:
+        logger.warning(f"Failed to start Ollama: {result['error']}")
+    return result["started"] and result["error"] is None
 
-    # Poll up to 10 s for Ollama to become ready
-    for _ in range(10):
-        await asyncio.sleep(1)
-        if await _is_ollama_reachable():
-            logger.info("Ollama started successfully")
-            return True
 
-    logger.warning("Ollama did not become reachable within 10 s")
-    return False
-
-
-async def _fetch_ollama_models() -> List[str]:
+async def _fetch_ollama_models(client: httpx.AsyncClient) -> List[str]:
     """Query Ollama for available model tags. Returns empty list on failure."""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{OLLAMA_HOST}/api/tags")
-            resp.raise_for_status()
-            data = resp.json()
-            return [m["name"] for m in data.get("models", [])]
+        # Back-to-back switches reuse the shared tag list for a few seconds
+        return await fetch_ollama_tags(client, max_age=_OLLAMA_SWITCH_TAGS_MAX_AGE)
     except Exception as exc:
         logger.warning(f"Could not reach Ollama to list models: {exc}")
         return []
@@ -154,6 +135,7 @@ class ModelSwitchRequest(BaseModel):
 @router.post("/switch")
 async def switch_model(
     body: ModelSwitchRequest,
+    request: Request,
     session: DBSession,
 ):
     """
@@ -172,15 +154,10 @@ async def switch_model(
     Changes take effect for all chat requests that START after this call
     returns.  Any stream already in progress continues with the old model.
     """
-    import app.config as config_module
-    from app.routes.dependencies import (
-        get_llamacpp_client,
-        set_llamacpp_client,
-        set_openai_client,
-    )
+    # Imported here so loading this router doesn't pull in LangChain
+    from app.openai_client import EnhancedOpenAIClient
 
     new_provider = body.provider.strip().lower()
-    current_provider = runtime_config.provider
 
     if new_provider not in ("llamacpp", "ollama", "openai"):
         raise HTTPException(
@@ -195,12 +172,13 @@ async def switch_model(
 
     if new_provider == "llamacpp":
         try:
-            available = sorted([f.name for f in LLAMACPP_MODELS_DIR.glob("*.gguf")])
+            # Directory scan (or its stat on a cache hit) runs off the event loop
+            available = await asyncio.to_thread(list_gguf_models)
         except Exception:
             available = []
     elif new_provider == "ollama":
         # Attempt to start Ollama if it isn't running
-        ollama_running = await _ensure_ollama_running()
+        ollama_running = await _ensure_ollama_running(request.app)
         if not ollama_running:
             return {
                 "success": False,
@@ -213,7 +191,7 @@ async def switch_model(
                     "Install Ollama from https://ollama.com and run 'ollama serve'."
                 ),
             }
-        available = await _fetch_ollama_models()
+        available = await _fetch_ollama_models(request.app.state.ollama_client)
     else:  # openai
         available = ["gpt-4o", "gpt-4o-mini"]
 
@@ -238,151 +216,163 @@ async def switch_model(
     # 2. Determine which model to activate
     # -----------------------------------------------------------------------
 
-    # Load UserSettings to check last-used model (used as preference hint)
+    # Load the last-used model from UserSettings as a preference hint; only
+    # needed when the request does not name a model explicitly
     saved_model: Optional[str] = None
-    user_settings = None
-    if body.user_id:
-        from app.database import UserSettings
-        user_settings = session.exec(
-            select(UserSettings).where(UserSettings.user_id == body.user_id)
+    if body.user_id and not body.model:
+        saved_model = session.exec(
+            select(UserSettings.default_model).where(UserSettings.user_id == body.user_id)
         ).first()
-        if user_settings:
-            saved_model = user_settings.default_model
 
     # Preference order: explicit request > last-used in settings > smallest/first
     preferred = body.model or saved_model
     selected_model = _pick_best_model(available, preferred)
 
-    # -----------------------------------------------------------------------
-    # 3. Determine if anything actually changes
-    # -----------------------------------------------------------------------
-    provider_changed = new_provider != current_provider
-    model_changed = (
-        (new_provider == "llamacpp" and selected_model != runtime_config.llamacpp_chat_model)
-        or (new_provider == "ollama" and selected_model != runtime_config.ollama_model)
-        or (new_provider == "openai" and selected_model != DEFAULT_OPENAI_LLM_MODEL)
-    )
-
-    if not provider_changed and not model_changed:
-        logger.info(f"Switch requested but already on {current_provider}/{selected_model} — skipping")
-        return {
-            "success": True,
-            "provider": new_provider,
-            "model": selected_model,
-            "models": available,
-            "changed": False,
-            "warning": None,
-        }
-
-    # -----------------------------------------------------------------------
-    # 4. Perform the switch
-    # -----------------------------------------------------------------------
+    # Serialize swaps: two concurrent switches could otherwise load two
+    # models into VRAM before either unload() runs. The current provider and
+    # model are read under the lock, since a switch that waited on it must
+    # act on the state the previous switch left behind
+    async with _switch_lock:
+        # -----------------------------------------------------------------------
+        # 3. Determine if anything actually changes
+        # -----------------------------------------------------------------------
+        current_provider = runtime_config.provider
+        provider_changed = new_provider != current_provider
+        model_changed = (
+            (new_provider == "llamacpp" and selected_model != runtime_config.llamacpp_chat_model)
+            or (new_provider == "ollama" and selected_model != runtime_config.ollama_model)
+            or (new_provider == "openai" and selected_model != DEFAULT_OPENAI_LLM_MODEL)
+        )
 
-    try:
-        if new_provider == "llamacpp":
-            # Validate model file exists
-            model_path = LLAMACPP_MODELS_DIR / selected_model
-            if not model_path.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"LlamaCpp model file not found: '{selected_model}'",
-                )
+        if not provider_changed and not model_changed:
+            logger.info(f"Switch requested but already on {current_provider}/{selected_model} — skipping")
+            return {
+                "success": True,
+                "provider": new_provider,
+                "model": selected_model,
+                "models": available,
+                "changed": False,
+                "warning": None,
+            }
 
-            # Preserve GPU layer count from existing client to avoid re-detection
-            existing_gpu_layers = LLAMACPP_N_GPU_LAYERS
-            try:
-                current_client = get_llamacpp_client()
-                existing_gpu_layers = current_client.n_gpu_layers
-                if model_changed:
-                    current_client.unload()
-            except Exception as e:
-                logger.warning(f"Could not unload existing LlamaCpp model: {e}")
-
-            from app.llamacpp_client import LlamaCppClient
-            new_client = LlamaCppClient(
-                chat_model_path=selected_model,
-                embedding_model_path=LLAMACPP_EMBED_MODEL,
-                models_dir=str(LLAMACPP_MODELS_DIR),
-                enable_parallel=LLAMACPP_ENABLE_PARALLEL,
-                n_ctx=LLAMACPP_N_CTX,
-                verbose=LLAMACPP_VERBOSE,
-                n_gpu_layers=existing_gpu_layers,
-            )
-            set_llamacpp_client(new_client)
-            runtime_config.llamacpp_chat_model = selected_model
-
-        elif new_provider == "ollama":
-            if provider_changed:
-                # Unload LlamaCpp chat model if switching away from it to free memory
-                if current_provider == "llamacpp":
-                    try:
-                        current_client = get_llamacpp_client()
-                        current_client.unload()
-                        logger.info("Unloaded LlamaCpp chat model (switching to Ollama)")
-                    except Exception as e:
-                        logger.warning(f"Could not unload LlamaCpp model: {e}")
-                # Build a fresh Ollama client
-                from app.openai_client import EnhancedOpenAIClient
-                new_client = EnhancedOpenAIClient(
-                    base_url=OLLAMA_HOST,
-                    api_key="ollama",
-                    provider="ollama",
+        # -----------------------------------------------------------------------
+        # 4. Perform the switch
+        # -----------------------------------------------------------------------
+        try:
+            if new_provider == "llamacpp":
+                # Re-check against the shared listing (one stat() when unchanged);
+                # the file may have gone while this request waited for the lock
+                if selected_model not in await asyncio.to_thread(list_gguf_models):
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"LlamaCpp model file not found: '{selected_model}'",
+                    )
+
+                # Preserve GPU layer count from existing client to avoid re-detection
+                existing_gpu_layers = LLAMACPP_N_GPU_LAYERS
+                try:
+                    current_client = get_llamacpp_client()
+                    existing_gpu_layers = current_client.n_gpu_layers
+                    if model_changed:
+                        await asyncio.to_thread(current_client.unload)
+                except Exception as e:
+                    logger.warning(f"Could not unload existing LlamaCpp model: {e}")
+
+                # Imported lazily: loading llama_cpp pulls in native libraries
+                # that the Ollama/OpenAI paths never need
+                from app.llamacpp_client import LlamaCppClient
+                # Model load can take seconds — keep it off the event loop so
+                # /health and in-flight streams keep being served
+                new_client = await asyncio.to_thread(
+                    LlamaCppClient,
+                    chat_model_path=selected_model,
+                    embedding_model_path=LLAMACPP_EMBED_MODEL,
+                    models_dir=str(LLAMACPP_MODELS_DIR),
+                    enable_parallel=LLAMACPP_ENABLE_PARALLEL,
+                    n_ctx=LLAMACPP_N_CTX,
+                    verbose=LLAMACPP_VERBOSE,
+                    n_gpu_layers=existing_gpu_layers,
                 )
-                set_openai_client(new_client)
-            runtime_config.ollama_model = selected_model
-
-        elif new_provider == "openai":
+                set_llamacpp_client(new_client)
+                runtime_config.llamacpp_chat_model = selected_model
+
+            elif new_provider == "ollama":
+                if provider_changed:
+                    # Unload LlamaCpp chat model if switching away from it to free memory
+                    if current_provider == "llamacpp":
+                        try:
+                            current_client = get_llamacpp_client()
+                            await asyncio.to_thread(current_client.unload)
+                            logger.info("Unloaded LlamaCpp chat model (switching to Ollama)")
+                        except Exception as e:
+                            logger.warning(f"Could not unload LlamaCpp model: {e}")
+                    # Build a fresh Ollama client
+                    new_client = EnhancedOpenAIClient(
+                        base_url=OLLAMA_HOST,
+                        api_key="ollama",
+                        provider="ollama",
+                    )
+                    set_openai_client(new_client)
+                runtime_config.ollama_model = selected_model
+
+            elif new_provider == "openai":
+                if provider_changed:
+                    # Unload LlamaCpp chat model if switching away from it to free memory
+                    if current_provider == "llamacpp":
+                        try:
+                            current_client = get_llamacpp_client()
+                            await asyncio.to_thread(current_client.unload)
+                            logger.info("Unloaded LlamaCpp chat model (switching to OpenAI)")
+                        except Exception as e:
+                            logger.warning(f"Could not unload LlamaCpp model: {e}")
+                    new_client = EnhancedOpenAIClient(
+                        base_url="https://api.openai.com/v1",
+                        api_key=OPENAI_API_KEY,
+                        provider="openai",
+                    )
+                    set_openai_client(new_client)
+
+            # Update the module-level PROVIDER and runtime_config so all subsequent
+            # requests (including health.py / capabilities) see the new provider
             if provider_changed:
-                # Unload LlamaCpp chat model if switching away from it to free memory
-                if current_provider == "llamacpp":
-                    try:
-                        current_client = get_llamacpp_client()
-                        current_client.unload()
-                        logger.info("Unloaded LlamaCpp chat model (switching to OpenAI)")
-                    except Exception as e:
-                        logger.warning(f"Could not unload LlamaCpp model: {e}")
-                from app.config import OPENAI_API_KEY
-                from app.openai_client import EnhancedOpenAIClient
-                new_client = EnhancedOpenAIClient(
-                    base_url="https://api.openai.com/v1",
-                    api_key=OPENAI_API_KEY,
-                    provider="openai",
+                config_module.PROVIDER = new_provider
+                runtime_config.provider = new_provider
+
+            # -----------------------------------------------------------------------
+            # 5. Persist to UserSettings
+            # -----------------------------------------------------------------------
+            # Single UPDATE by the unique user_id index — no load/mutate/flush
+            # round-trip; a user without a settings row is left untouched
+            if body.user_id:
+                result = session.exec(
+                    update(UserSettings)
+                    .where(UserSettings.user_id == body.user_id)
+                    .values(
+                        default_model=selected_model,
+                        provider=new_provider,
+                        updated_at=datetime.now(timezone.utc),
+                    )
                 )
-                set_openai_client(new_client)
-
-        # Update the module-level PROVIDER and runtime_config so all subsequent
-        # requests (including health.py / capabilities) see the new provider
-        if provider_changed:
-            config_module.PROVIDER = new_provider
-            runtime_config.provider = new_provider
-
-        # -----------------------------------------------------------------------
-        # 5. Persist to UserSettings
-        # -----------------------------------------------------------------------
-        if user_settings:
-            user_settings.default_model = selected_model
-            user_settings.provider = new_provider
-            user_settings.updated_at = datetime.now(timezone.utc)
-            session.add(user_settings)
-            session.commit()
-            logger.info(
-                f"Persisted provider='{new_provider}' model='{selected_model}' "
-                f"to UserSettings for user {body.user_id}"
-            )
-
-        logger.info(f"✅ Switched to provider='{new_provider}' model='{selected_model}'")
-        return {
-            "success": True,
-            "provider": new_provider,
-            "model": selected_model,
-            "models": available,
-            "changed": True,
-            "warning": None,
-        }
+                session.commit()
+                if result.rowcount:
+                    logger.info(
+                        f"Persisted provider='{new_provider}' model='{selected_model}' "
+                        f"to UserSettings for user {body.user_id}"
+                    )
+
+            logger.info(f"✅ Switched to provider='{new_provider}' model='{selected_model}'")
+            return {
+                "success": True,
+                "provider": new_provider,
+                "model": selected_model,
+                "models": available,
+                "changed": True,
+                "warning": None,
+            }
 
-    except HTTPException:
-        raise
-    except Exception as exc:
-        logger.exception(f"Failed to switch to provider='{new_provider}' model='{selected_model}'")
-        raise HTTPException(status_code=500, detail=f"Model switch failed: {str(exc)}")
+        except HTTPException:
+            raise
+        except Exception as exc:
+            logger.exception(f"Failed to switch to provider='{new_provider}' model='{selected_model}'")
+            raise HTTPException(status_code=500, detail=f"Model switch failed: {str(exc)}")
 
@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException
 from sqlmodel import select
 
 from app.database import User, UserCreate, UserResponse, UserSettings, SettingsUpdate
-from app.routes.dependencies import DBSession
+from app.routes.dependencies import DBSession, ReadOnlyDBSession
 from app.config import logger, DEFAULT_SETTINGS
 from datetime import datetime, timezone
 
@@ -32,19 +32,16 @@ async def create_user(user_data: UserCreate, session: DBSession):
                 created_at=existing_user.created_at
             )
         
-        # Create new user
+        # Create new user with default settings in one transaction
+        # (User.id is generated client-side, so settings can reference it before flush)
         user = User(
             username=user_data.username,
             email=user_data.email
         )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        
-        # Create default settings for user
         default_settings = UserSettings(user_id=user.id)
-        session.add(default_settings)
+        session.add_all([user, default_settings])
         session.commit()
+        session.refresh(user)
         
         logger.info(f"Created new user: {user.username} (ID: {user.id})")
         
@@ -61,7 +58,7 @@ async def create_user(user_data: UserCreate, session: DBSession):
 
 
 @router.get("/{username}", response_model=UserResponse)
-async def get_user_by_username(username: str, session: DBSession):
+async def get_user_by_username(username: str, session: ReadOnlyDBSession):
     """Get user information by username."""
     try:
         user = session.exec(
@@ -85,7 +82,7 @@ async def get_user_by_username(username: str, session: DBSession):
 
 
 @router.get("/id/{user_id}", response_model=UserResponse)
-async def get_user_by_id(user_id: str, session: DBSession):
+async def get_user_by_id(user_id: str, session: ReadOnlyDBSession):
     """Get user information by ID."""
     try:
         user = session.get(User, user_id)
@@ -110,17 +107,18 @@ async def get_user_by_id(user_id: str, session: DBSession):
 async def get_user_settings(user_id: str, session: DBSession):
     """Get user settings by user ID."""
     try:
-        # Query UserSettings by user_id
-        user_settings = session.exec(
-            select(UserSettings).where(UserSettings.user_id == user_id)
+        # Fetch user existence and settings in one query
+        row = session.exec(
+            select(User.id, UserSettings)
+            .outerjoin(UserSettings, UserSettings.user_id == User.id)
+            .where(User.id == user_id)
         ).first()
         
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"User with ID '{user_id}' not found")
+        
+        user_settings = row[1]
         if not user_settings:
-            # Verify user exists
-            user = session.get(User, user_id)
-            if not user:
-                raise HTTPException(status_code=404, detail=f"User with ID '{user_id}' not found")
-            
             # Create default settings if missing (safety fallback)
             logger.warning(f"UserSettings missing for user {user_id}, creating defaults")
             user_settings = UserSettings(
@@ -164,7 +162,7 @@ async def update_user_settings(user_id: str, settings_update: SettingsUpdate, se
         # Update timestamp
         user_settings.updated_at = datetime.now(timezone.utc)
         
-        session.add(user_settings)
+        # Already tracked by the session (loaded above), so no add() needed
         session.commit()
         session.refresh(user_settings)
         
@@ -4,7 +4,7 @@ Utility functions for text extraction from various file types.
 
 Supports:
 - Plain text, markdown, Python files
-- PDF with PyPDF2 and OCR fallback (Tesseract)
+- PDF with pypdfium2/PyPDF2 and OCR fallback (Tesseract)
 - JSON files
 
 Enhanced from chat-backend with OCR and JSON support.
@@ -12,18 +12,96 @@ Enhanced from chat-backend with OCR and JSON support.
 from pathlib import Path
 from typing import Optional
 import logging
-import json
+import hashlib
 import httpx
+import orjson
 import asyncio
 import subprocess
+import sys
+import threading
 import time
 import os
-from datetime import datetime
+import mmap
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 
-from app.config import POPPLER_PATH, OLLAMA_HOST
+from app.config import POPPLER_PATH, OLLAMA_HOST, EXTRACTED_TEXT_CACHE_DIR, PROVIDER_CACHE_PATH
 
 logger = logging.getLogger("chat_backend.utils")
 
+# Import PDF/OCR libraries once with graceful error handling.
+# pypdfium2 (native PDFium) is preferred for embedded text; PyPDF2 is the fallback
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    pdfium = None
+    PDFIUM_AVAILABLE = False
+    logger.warning("pypdfium2 not available, falling back to PyPDF2. Install: pip install pypdfium2")
+
+# PDFium is not thread-safe; every pdfium call goes through this lock
+_pdfium_lock = threading.Lock()
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PyPDF2 = None
+    PYPDF2_AVAILABLE = False
+    logger.warning("PyPDF2 not available. Install: pip install PyPDF2")
+
+# OCR engine: tesserocr calls libtesseract in-process; pytesseract (which runs
+# the tesseract CLI once per image) is the fallback
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+    if not TESSEROCR_AVAILABLE:
+        logger.warning("pytesseract not available, OCR disabled. Install: pip install pytesseract")
+
+# Page rendering for OCR: PDFium renders in-process; pdf2image (poppler) is the fallback
+try:
+    from pdf2image import convert_from_path
+except ImportError:
+    convert_from_path = None
+    if not PDFIUM_AVAILABLE:
+        logger.warning("pdf2image not available, OCR disabled. Install: pip install pypdfium2")
+
+OCR_AVAILABLE = (
+    (TESSEROCR_AVAILABLE or pytesseract is not None)
+    and (PDFIUM_AVAILABLE or convert_from_path is not None)
+)
+
+# One tesserocr API per OCR thread: an instance is not thread-safe, but is
+# cheap to reuse once its language data is loaded
+_ocr_local = threading.local()
+
+# Render at pdf2image's default 200 DPI (PDF user space is 72 units per inch)
+_OCR_RENDER_SCALE = 200 / 72
+
+# Extracted text keyed by file content, so re-uploading the same PDF skips OCR
+try:
+    from diskcache import Cache
+    _text_cache = Cache(str(EXTRACTED_TEXT_CACHE_DIR), size_limit=2**30)  # 1 GiB
+except ImportError:
+    _text_cache = None
+    logger.warning("diskcache not available, extracted text will not be cached. Install: pip install diskcache")
+
+# Only types whose extraction costs more than hashing the file are cached
+_CACHED_CONTENT_TYPES = {"application/pdf"}
+
+# Per-thread flag set when a PDF had pages needing OCR but OCR is not
+# installed, so that incomplete result is kept out of the cache
+_extraction_state = threading.local()
+
 
 async def detect_available_provider(preferred_provider: Optional[str] = None) -> dict:
     """
@@ -92,13 +170,14 @@ async def detect_available_provider(preferred_provider: Optional[str] = None) ->
         
         # Try to ensure Ollama is running (will start if needed)
         ollama_status = await ensure_ollama_running(OLLAMA_HOST)
+        # Track a server we spawned even if we fall back below, so shutdown stops it
+        result["process"] = ollama_status.get("process")
         
         if ollama_status["running"] and len(ollama_status.get("models", [])) > 0:
             result["provider"] = "ollama"
             result["available"] = True
             result["models"] = ollama_status.get("models", [])
             result["started_by_us"] = ollama_status.get("started_by_us", False)
-            result["process"] = ollama_status.get("process")
             result["reason"] = f"Ollama {'started' if result['started_by_us'] else 'detected'} with {len(result['models'])} models"
             logger.info(f"✅ {result['reason']}")
             return result
@@ -135,49 +214,209 @@ async def detect_available_provider(preferred_provider: Optional[str] = None) ->
     return result
 
 
-async def check_ollama_health(base_url: str = OLLAMA_HOST, timeout: float = 5.0) -> dict:
+# Detection results older than this are ignored and detection runs again
+_PROVIDER_CACHE_TTL = 60.0  # seconds
+
+
+def _provider_cache_key(preferred_provider: Optional[str]) -> str:
+    """Fingerprint of the settings detection depends on; a change invalidates the cache."""
+    from app.config import LLAMACPP_MODELS_DIR, LLAMACPP_CHAT_MODEL
+    settings = f"{preferred_provider}|{OLLAMA_HOST}|{LLAMACPP_MODELS_DIR}|{LLAMACPP_CHAT_MODEL}"
+    return hashlib.sha1(settings.encode("utf-8")).hexdigest()
+
+
+async def load_provider_cache(preferred_provider: Optional[str] = None) -> Optional[dict]:
+    """
+    Return the cached detection result if it is fresh, was made with the same
+    settings and the provider still checks out; otherwise None.
+    
+    Revalidation is a single short probe (Ollama health, model file or API
+    key), so quick restarts skip the full detection (and any Ollama spawn).
+    The result has the same shape as detect_available_provider's.
+    """
+    try:
+        data = orjson.loads(PROVIDER_CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    if data.get("key") != _provider_cache_key(preferred_provider):
+        return None
+    if time.time() - data.get("ts", 0) > _PROVIDER_CACHE_TTL:
+        return None
+    
+    provider = data.get("provider")
+    models = data.get("models", [])
+    if provider == "ollama":
+        health = await check_ollama_health(OLLAMA_HOST, timeout=0.5, use_cache=False)
+        if not health["available"] or not health.get("models"):
+            return None
+        models = health["models"]
+    elif provider == "llamacpp":
+        from app.config import LLAMACPP_MODELS_DIR, LLAMACPP_CHAT_MODEL
+        if not (LLAMACPP_MODELS_DIR / LLAMACPP_CHAT_MODEL).exists():
+            return None
+    elif provider == "openai":
+        from app.config import OPENAI_API_KEY
+        if not OPENAI_API_KEY:
+            return None
+    else:
+        return None
+    
+    return {
+        "provider": provider,
+        "available": True,
+        "reason": f"{data.get('reason', 'Previous detection')} (cached)",
+        "ollama_checked": provider == "ollama",
+        "models": models,
+        "started_by_us": False,
+        "process": None,
+        "cached": True
+    }
+
+
+def save_provider_cache(preferred_provider: Optional[str], detection: dict) -> None:
+    """Persist a fresh, successful detection result for load_provider_cache."""
+    if not detection.get("available") or detection.get("cached"):
+        return
+    data = {
+        "key": _provider_cache_key(preferred_provider),
+        "ts": time.time(),
+        "provider": detection["provider"],
+        "models": detection.get("models", []),
+        "reason": detection.get("reason")
+    }
+    try:
+        PROVIDER_CACHE_PATH.write_bytes(orjson.dumps(data))
+    except OSError as e:
+        logger.debug(f"Could not write provider cache: {e}")
+
+
+# Shared client for Ollama probes, created on first use and closed by the
+# lifespan shutdown, so repeated checks reuse a keep-alive connection
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared probe client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=30.0),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared probe client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Successful health results per base URL, reused for a short window so that
+# back-to-back callers (startup checks, provider detection) skip the two HTTP
+# round-trips. The per-URL lock coalesces concurrent misses into one probe.
+_OLLAMA_HEALTH_TTL = 1.0  # seconds
+_ollama_health_cache: dict = {}  # base_url -> (monotonic ts, result)
+_ollama_health_locks: dict = {}  # base_url -> asyncio.Lock
+
+
+async def check_ollama_health(
+    base_url: str = OLLAMA_HOST,
+    timeout: float = 5.0,
+    use_cache: bool = True,
+    want_version: bool = False
+) -> dict:
     """
     Check if Ollama is running and accessible.
     
     Args:
         base_url: Ollama base URL (e.g., http://localhost:11434)
         timeout: Request timeout in seconds
+        use_cache: Return a result cached within the last _OLLAMA_HEALTH_TTL
+            seconds if there is one. Readiness polling passes False.
+        want_version: Also query /api/version. Only informational, so polling
+            callers leave it off and save the extra request.
         
     Returns:
-        Dict with 'available' (bool), 'version' (str), and 'models' (list) if available
+        Dict with 'available' (bool), 'models' (list) if available, and
+        'version' (str) when requested
     """
+    if use_cache and (cached := _cached_health(base_url, want_version)):
+        return cached
+    
+    lock = _ollama_health_locks.setdefault(base_url, asyncio.Lock())
+    async with lock:
+        # Another caller may have refreshed the entry while we waited for the lock
+        if use_cache and (cached := _cached_health(base_url, want_version)):
+            return cached
+        
+        result = await _probe_ollama(base_url, timeout, want_version)
+        # Only successful probes are cached; a down server is re-probed every call
+        if result["available"]:
+            _ollama_health_cache[base_url] = (time.monotonic(), result)
+        return dict(result)
+
+
+def _cached_health(base_url: str, want_version: bool) -> Optional[dict]:
+    """Copy of a fresh cached result, or None (also if it lacks a wanted version)."""
+    cached = _ollama_health_cache.get(base_url)
+    if not cached or time.monotonic() - cached[0] >= _OLLAMA_HEALTH_TTL:
+        return None
+    if want_version and "version" not in cached[1]:
+        return None
+    return dict(cached[1])
+
+
+async def _probe_ollama(base_url: str, timeout: float, want_version: bool) -> dict:
+    """Query Ollama's tags (and optionally version) endpoints, uncached."""
     result = {
         "available": False,
         "url": base_url,
-        "checked_at": datetime.now().isoformat(),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
         "error": None
     }
     
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            # Check tags endpoint (lists available models)
-            response = await client.get(f"{base_url}/api/tags")
+        client = _get_http_client()
+        
+        # Check tags endpoint (lists available models). When the version is
+        # wanted too, fetch both at once; tags stays authoritative for availability
+        if want_version:
+            response, version_response = await asyncio.gather(
+                client.get(f"{base_url}/api/tags", timeout=timeout),
+                client.get(f"{base_url}/api/version", timeout=timeout),
+                return_exceptions=True
+            )
+            if isinstance(response, BaseException):
+                raise response
+        else:
+            response = await client.get(f"{base_url}/api/tags", timeout=timeout)
+            version_response = None
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            result["available"] = True
+            # Store full model names with exact versions
+            result["models"] = [model["name"] for model in data.get("models", [])]
+            result["model_count"] = len(result["models"])
             
-            if response.status_code == 200:
-                data = response.json()
-                result["available"] = True
-                # Store full model names with exact versions
-                result["models"] = [model["name"] for model in data.get("models", [])]
-                result["model_count"] = len(result["models"])
-                
-                # Optional: Check version endpoint
-                try:
-                    version_response = await client.get(f"{base_url}/api/version")
-                    if version_response.status_code == 200:
-                        result["version"] = version_response.json().get("version", "unknown")
-                except Exception:
-                    pass  # Version check is optional
-                
-                logger.info(f"Ollama available at {base_url} ({result['model_count']} models)")
+            if want_version:
+                result["version"] = "unknown"
+                if not isinstance(version_response, BaseException) and version_response.status_code == 200:
+                    try:
+                        result["version"] = orjson.loads(version_response.content).get("version", "unknown")
+                    except Exception:
+                        pass  # Version is informational only
+                logger.info(f"Ollama {result['version']} available at {base_url} ({result['model_count']} models)")
             else:
-                result["error"] = f"HTTP {response.status_code}"
-                logger.warning(f"Ollama responded with status {response.status_code}")
-                
+                logger.info(f"Ollama available at {base_url} ({result['model_count']} models)")
+        else:
+            result["error"] = f"HTTP {response.status_code}"
+            logger.warning(f"Ollama responded with status {response.status_code}")
+            
     except httpx.ConnectError:
         result["error"] = "Connection refused - Ollama not running"
         logger.debug(f"Cannot connect to Ollama at {base_url} (connection refused)")
@@ -191,12 +430,36 @@ async def check_ollama_health(base_url: str = OLLAMA_HOST, timeout: float = 5.0)
     return result
 
 
+# Total time to wait for a freshly spawned `ollama serve` to answer health checks
+_OLLAMA_START_TIMEOUT = 15.0  # seconds
+_OLLAMA_READY_MARKER = b"Listening on"
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: set = set()
+
+
+async def _drain_ollama_stderr(stream: asyncio.StreamReader, ready: asyncio.Event) -> None:
+    """
+    Read `ollama serve` stderr for the life of the process, setting `ready` on
+    its "Listening on" line. The pipe must keep being drained or the server
+    blocks once the OS pipe buffer fills with log output.
+    """
+    while line := await stream.readline():
+        if not ready.is_set() and _OLLAMA_READY_MARKER in line:
+            ready.set()
+
+
 async def start_ollama_server() -> dict:
     """
-    Attempt to start Ollama server as independent background process.
+    Attempt to start Ollama server as a background process owned by the backend.
+
+    Its stderr is piped to (and drained by) this process, so the server must be
+    stopped with stop_ollama_process() before the backend exits; once the pipe
+    closes, Ollama would die on its next log line anyway.
     
     Returns:
-        Dict with 'started' (bool), 'process' (subprocess.Popen or None), 'error' (str or None)
+        Dict with 'started' (bool), 'process' (asyncio.subprocess.Process, or
+        subprocess.Popen on loops without subprocess support, or None), 'error' (str or None)
     """
     result = {
         "started": False,
@@ -208,57 +471,86 @@ async def start_ollama_server() -> dict:
     try:
         logger.info("Attempting to start Ollama server...")
         
-        # Start ollama serve as completely independent detached process
-        # This process will continue running even after backend exits
-        import sys
+        # Start ollama serve in its own session / without a console, so it
+        # doesn't receive the backend's console signals; the lifespan shutdown
+        # stops it (see stop_ollama_process)
         if sys.platform == "win32":
             # Windows: Start detached process without console window
             # DETACHED_PROCESS makes it independent from parent process
             startupinfo = subprocess.STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             startupinfo.wShowWindow = subprocess.SW_HIDE
-            
-            process = subprocess.Popen(
-                ["ollama", "serve"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                stdin=subprocess.DEVNULL,
-                startupinfo=startupinfo,
-                creationflags=subprocess.CREATE_NO_WINDOW | subprocess.DETACHED_PROCESS,
-                close_fds=True
-            )
+            spawn_kwargs = {
+                "startupinfo": startupinfo,
+                "creationflags": subprocess.CREATE_NO_WINDOW | subprocess.DETACHED_PROCESS,
+            }
         else:
             # Linux/Mac: Start as daemon-like process
-            process = subprocess.Popen(
+            spawn_kwargs = {"start_new_session": True}  # Detach from parent session
+        
+        # Spawn through the event loop so the fork/exec does not block it.
+        # stdout is discarded; stderr is piped and drained in the background
+        # until EOF (the pipe never fills), and its "Listening on" line wakes
+        # the health polling below as soon as the server is up
+        ready = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ollama", "serve",
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                **spawn_kwargs
+            )
+            ready = asyncio.Event()
+            task = asyncio.create_task(_drain_ollama_stderr(process.stderr, ready))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        except NotImplementedError:
+            # Event loops without subprocess support (Windows selector loop)
+            process = await asyncio.to_thread(
+                subprocess.Popen,
                 ["ollama", "serve"],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 stdin=subprocess.DEVNULL,
-                start_new_session=True  # Detach from parent session
+                **spawn_kwargs
             )
         
-        # Give Ollama a moment to initialize
         logger.info("Waiting for Ollama to initialize...")
-        await asyncio.sleep(3)
         
         # Verify health instead of checking process status
-        # (process is detached, so we can't poll it reliably)
-        max_wait = 15
-        for i in range(max_wait):
-            health = await check_ollama_health(timeout=2.0)
+        # (process is detached, so we can't poll it reliably).
+        # Back off 50 ms → 1 s so a fast start is noticed within one short probe
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        deadline = started_at + _OLLAMA_START_TIMEOUT
+        delay = 0.05
+        while (remaining := deadline - loop.time()) > 0:
+            health = await check_ollama_health(timeout=min(2.0, remaining), use_cache=False)
             if health["available"]:
                 result["started"] = True
                 result["process"] = process  # Store reference so we can kill it on shutdown
-                logger.info(f"✅ Ollama server started successfully (took {i+1}s)")
+                logger.info(f"✅ Ollama server started successfully (took {loop.time() - started_at:.1f}s)")
                 logger.info(f"   Found {len(health.get('models', []))} models available")
                 return result
-            await asyncio.sleep(1)
+            wait = min(delay, max(0.0, deadline - loop.time()))
+            if ready is not None and not ready.is_set():
+                try:
+                    await asyncio.wait_for(ready.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(wait)
+            delay = min(delay * 2, 1.0)
         
         # Timeout waiting for health
-        result["error"] = "Ollama process started but health check failed after 15s"
+        result["error"] = f"Ollama process started but health check failed after {_OLLAMA_START_TIMEOUT:.0f}s"
         logger.warning(f"⚠️ {result['error']}")
-        logger.warning("   Ollama may still be starting up. It will continue running in background.")
+        logger.warning("   Ollama may still be starting up; it will be stopped when the backend exits.")
         result["started"] = True  # Mark as started, let it continue initializing
+        # Still track it: its stderr pipe is drained by this process, so it must
+        # be stopped on shutdown rather than left writing into a closed pipe
+        result["process"] = process
         
     except FileNotFoundError:
         result["error"] = "Ollama command not found - Ollama is not installed"
@@ -270,18 +562,49 @@ async def start_ollama_server() -> dict:
     return result
 
 
-def stop_ollama_process(process: subprocess.Popen) -> bool:
+def _taskkill_tree(pid: int) -> None:
+    """Windows: stop ollama.exe and all its child processes, forcing if needed."""
+    # Try graceful shutdown first
+    subprocess.run(
+        ["taskkill", "/PID", str(pid), "/T"],
+        capture_output=True,
+        timeout=5
+    )
+    time.sleep(2)
+    
+    # Check if still running, force kill if necessary
+    result = subprocess.run(
+        ["tasklist", "/FI", f"PID eq {pid}"],
+        capture_output=True,
+        text=True
+    )
+    if str(pid) in result.stdout:
+        logger.warning("Ollama didn't stop gracefully, forcing kill...")
+        subprocess.run(
+            ["taskkill", "/PID", str(pid), "/T", "/F"],
+            capture_output=True,
+            timeout=5
+        )
+
+
+async def _wait_process(process, timeout: Optional[float]) -> None:
+    """Wait for either an asyncio subprocess or a Popen fallback to exit."""
+    if isinstance(process, subprocess.Popen):
+        await asyncio.to_thread(process.wait, timeout)
+    else:
+        await asyncio.wait_for(process.wait(), timeout)
+
+
+async def stop_ollama_process(process) -> bool:
     """
     Stop Ollama process gracefully (or forcefully if needed).
     
     Args:
-        process: Popen object for Ollama process
+        process: Ollama process returned by start_ollama_server
         
     Returns:
         True if successfully stopped, False otherwise
     """
-    import sys
-    
     if not process:
         return False
     
@@ -291,28 +614,7 @@ def stop_ollama_process(process: subprocess.Popen) -> bool:
         if sys.platform == "win32":
             # Windows: Use taskkill to stop ollama.exe and all child processes
             try:
-                # Try graceful shutdown first
-                subprocess.run(
-                    ["taskkill", "/PID", str(process.pid), "/T"],
-                    capture_output=True,
-                    timeout=5
-                )
-                time.sleep(2)
-                
-                # Check if still running, force kill if necessary
-                result = subprocess.run(
-                    ["tasklist", "/FI", f"PID eq {process.pid}"],
-                    capture_output=True,
-                    text=True
-                )
-                if str(process.pid) in result.stdout:
-                    logger.warning("Ollama didn't stop gracefully, forcing kill...")
-                    subprocess.run(
-                        ["taskkill", "/PID", str(process.pid), "/T", "/F"],
-                        capture_output=True,
-                        timeout=5
-                    )
-                
+                await asyncio.to_thread(_taskkill_tree, process.pid)
                 logger.info("✅ Ollama process stopped")
                 return True
                 
@@ -321,7 +623,7 @@ def stop_ollama_process(process: subprocess.Popen) -> bool:
                 # Fallback to terminate
                 try:
                     process.terminate()
-                    process.wait(timeout=5)
+                    await _wait_process(process, 5)
                     return True
                 except:
                     process.kill()
@@ -330,16 +632,19 @@ def stop_ollama_process(process: subprocess.Popen) -> bool:
             # Linux/Mac: Standard termination
             process.terminate()
             try:
-                process.wait(timeout=5)
+                await _wait_process(process, 5)
                 logger.info("✅ Ollama process stopped gracefully")
                 return True
-            except subprocess.TimeoutExpired:
+            except (asyncio.TimeoutError, subprocess.TimeoutExpired):
                 logger.warning("Ollama didn't stop gracefully, forcing kill...")
                 process.kill()
-                process.wait()
+                await _wait_process(process, None)
                 logger.info("✅ Ollama process killed")
                 return True
                 
+    except ProcessLookupError:
+        logger.info("Ollama process had already exited")
+        return True
     except Exception as e:
         logger.error(f"Failed to stop Ollama process: {e}")
         return False
@@ -400,7 +705,17 @@ async def ensure_ollama_running(base_url: str = OLLAMA_HOST) -> dict:
         return result
 
 
-def extract_text_from_file(file_path: Path, content_type: str) -> str:
+async def extract_text_from_file(file_path: Path, content_type: str) -> str:
+    """
+    Extract text from file at file_path without blocking the event loop.
+    
+    Reading, PDF parsing and OCR run in a worker thread (OCR pages fan out
+    further onto the shared OCR pool). See _extract_text_from_file_sync.
+    """
+    return await asyncio.to_thread(_extract_text_from_file_sync, file_path, content_type)
+
+
+def _extract_text_from_file_sync(file_path: Path, content_type: str) -> str:
     """
     Extract text from file at file_path. 
     
@@ -417,32 +732,48 @@ def extract_text_from_file(file_path: Path, content_type: str) -> str:
         Extracted text content
     """
     try:
-        # Plain text files
-        if content_type in ("text/plain", "text/markdown", "text/x-python"):
-            return file_path.read_text(encoding="utf-8")
+        extractor = _EXTRACTORS.get(content_type)
+        if extractor is None:
+            return f"[Unsupported content type: {content_type}]"
+        if _text_cache is None or content_type not in _CACHED_CONTENT_TYPES:
+            return extractor(file_path)
         
-        # JSON files
-        if content_type == "application/json":
-            return extract_text_from_json(file_path)
-
-        # PDF files (with OCR fallback)
-        if content_type == "application/pdf":
-            return extract_text_from_pdf(file_path)
-
-        # Unsupported type
-        return f"[Unsupported content type: {content_type}]"
+        key = f"{content_type}:{_file_digest(file_path)}"
+        text = _text_cache.get(key)
+        if text is None:
+            _extraction_state.ocr_skipped = False
+            text = extractor(file_path)
+            # Don't pin failures, empty results or text missing its OCR pages;
+            # a later upload may succeed (e.g. once OCR is installed)
+            if (
+                text.strip()
+                and not _extraction_state.ocr_skipped
+                and not text.startswith(("[PDF extraction error", "[PDF library not available"))
+            ):
+                _text_cache.set(key, text)
+        else:
+            logger.info(f"Using cached text for {file_path.name} ({len(text)} characters)")
+        return text
 
     except Exception as e:
         logger.exception("Error extracting text")
         return f"[Error extracting text: {str(e)}]"
 
 
+# Long-lived pool for per-page OCR, shared by all uploads so concurrent
+# documents together stay within one worker per core. pdftoppm and tesseract
+# run as external processes, so threads (rather than a process pool, which
+# is fragile in the frozen Windows build) already run pages in parallel
+_OCR_WORKERS = os.cpu_count() or 1
+_ocr_pool = ThreadPoolExecutor(max_workers=_OCR_WORKERS, thread_name_prefix="ocr")
+
+
 def extract_text_from_pdf(file_path: Path) -> str:
     """
-    Extract text from PDF using PyPDF2 with OCR fallback.
+    Extract text from PDF using pypdfium2 (or PyPDF2) with OCR fallback.
     
     Process:
-    1. Try extracting embedded text with PyPDF2
+    1. Try extracting embedded text with pypdfium2, or PyPDF2 if unavailable
     2. If no text found, use Tesseract OCR on converted images
     
     Args:
@@ -451,78 +782,208 @@ def extract_text_from_pdf(file_path: Path) -> str:
     Returns:
         Extracted text content
     """
+    if not (PDFIUM_AVAILABLE or PYPDF2_AVAILABLE):
+        logger.error("No PDF library installed. Install: pip install pypdfium2")
+        return "[PDF library not available]"
+    
+    pdf = None
+    pending = []
     try:
-        import PyPDF2
+        # First try embedded text extraction. The PDFium document stays open
+        # so OCR can render its pages without reopening the file per page
+        if PDFIUM_AVAILABLE:
+            with _pdfium_lock:
+                pdf = pdfium.PdfDocument(str(file_path))
+            pages_text = _extract_pages_pdfium(pdf)
+        else:
+            pages_text = _extract_pages_pypdf2(file_path)
         
-        # First try embedded text extraction
-        with open(file_path, "rb") as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            pages_text = []
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                
-                # If no embedded text, try OCR
-                if not page_text.strip():
-                    logger.info(f"No embedded text in page {page_num + 1}, trying OCR...")
-                    ocr_text = extract_pdf_page_with_ocr(file_path, page_num)
-                    if ocr_text:
-                        pages_text.append(ocr_text)
-                else:
-                    pages_text.append(page_text)
-            
-            full_text = "\n\n".join(pages_text)
-            logger.info(f"Extracted {len(full_text)} characters from PDF")
-            return full_text
+        # Pages without embedded text fall back to OCR, run in parallel on the
+        # shared OCR pool, one batch per worker (interleaved so slow pages spread out)
+        ocr_pages = [i for i, text in enumerate(pages_text) if not text.strip()]
+        if ocr_pages and not OCR_AVAILABLE:
+            logger.warning(f"Pages {[i + 1 for i in ocr_pages]} have no embedded text and OCR is not available")
+            _extraction_state.ocr_skipped = True
+        elif ocr_pages:
+            logger.info(f"No embedded text in pages {[i + 1 for i in ocr_pages]}, trying OCR...")
+            workers = min(len(ocr_pages), _OCR_WORKERS)
+            batches = [ocr_pages[i::workers] for i in range(workers)]
+            pending = [_ocr_pool.submit(extract_pdf_pages_with_ocr, file_path, batch, pdf=pdf) for batch in batches]
+            for batch, future in zip(batches, pending):
+                for page_num, ocr_text in zip(batch, future.result()):
+                    pages_text[page_num] = ocr_text
+        
+        full_text = "\n\n".join(text for text in pages_text if text)
+        logger.info(f"Extracted {len(full_text)} characters from PDF")
+        return full_text
             
-    except ImportError:
-        logger.error("PyPDF2 not installed. Install: pip install PyPDF2")
-        return "[PyPDF2 not available]"
     except Exception as e:
         logger.exception("PDF extraction failed")
         return f"[PDF extraction error: {str(e)}]"
+    finally:
+        # On error, other batches may still be rendering from the document;
+        # let them finish before closing it
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        if pdf is not None:
+            with _pdfium_lock:
+                pdf.close()
+
+
+def _extract_pages_pdfium(pdf) -> list:
+    """Embedded text of each page via PDFium (native, much faster than PyPDF2)."""
+    with _pdfium_lock:
+        pages_text = []
+        for page_num in range(len(pdf)):
+            page = pdf[page_num]
+            textpage = page.get_textpage()
+            pages_text.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return pages_text
+
+
+def _extract_pages_pypdf2(file_path: Path) -> list:
+    """Embedded text of each page via PyPDF2."""
+    # The reader seeks around the file (xref table, object streams); a
+    # read-only mmap serves those reads from the OS page cache instead of
+    # buffered copies through the Python heap
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pdf_reader = PyPDF2.PdfReader(mm)
+        return [page.extract_text() for page in pdf_reader.pages]
 
 
-def extract_pdf_page_with_ocr(file_path: Path, page_num: int) -> str:
+def extract_pdf_page_with_ocr(file_path: Path, page_num: int, pdf=None) -> str:
     """
     Extract text from single PDF page using OCR.
     
     Args:
         file_path: Path to PDF file
         page_num: Zero-indexed page number
+        pdf: Already-open pypdfium2 document for file_path, if the caller has one
         
     Returns:
         OCR-extracted text or empty string on failure
     """
+    if not OCR_AVAILABLE:
+        return ""
+    
     try:
-        from pdf2image import convert_from_path
-        import pytesseract
-        
         # Convert PDF page to image
-        images = convert_from_path(
-            str(file_path),
-            first_page=page_num + 1,
-            last_page=page_num + 1,
-            poppler_path=POPPLER_PATH
-        )
+        image = _render_pdf_page(file_path, page_num, pdf)
         
-        if images:
+        if image is not None:
             # Extract text using Tesseract OCR
-            text = pytesseract.image_to_string(images[0])
+            text = _ocr_image(image)
             logger.info(f"OCR extracted {len(text)} characters from page {page_num + 1}")
             return text
         else:
             logger.warning(f"Could not convert page {page_num + 1} to image")
             return ""
             
-    except ImportError as e:
-        logger.warning(f"OCR dependencies not available: {e}")
-        return ""
     except Exception as e:
         logger.error(f"OCR error for page {page_num + 1}: {e}")
         return ""
 
 
+def extract_pdf_pages_with_ocr(file_path: Path, page_nums: list, pdf=None) -> list:
+    """
+    Extract text from several PDF pages using OCR, in page_nums order.
+    
+    With pytesseract, each page is rendered to a temporary PNG and the whole
+    batch goes through a single tesseract run (a list file of image paths),
+    so the language model loads once per batch instead of once per page.
+    tesserocr already keeps a loaded API per thread, so it OCRs page by page.
+    
+    Args:
+        file_path: Path to PDF file
+        page_nums: Zero-indexed page numbers
+        pdf: Already-open pypdfium2 document for file_path, if the caller has one
+        
+    Returns:
+        OCR-extracted text per page (empty string for pages that failed)
+    """
+    if not OCR_AVAILABLE:
+        return [""] * len(page_nums)
+    if TESSEROCR_AVAILABLE or pytesseract is None or len(page_nums) == 1:
+        return [extract_pdf_page_with_ocr(file_path, page_num, pdf) for page_num in page_nums]
+    
+    try:
+        with tempfile.TemporaryDirectory(prefix="ocr_") as tmp_dir:
+            # Render one page at a time to disk so only one bitmap is in memory
+            image_paths = []
+            for page_num in page_nums:
+                image = _render_pdf_page(file_path, page_num, pdf)
+                if image is None:
+                    raise ValueError(f"could not convert page {page_num + 1} to image")
+                image_path = os.path.join(tmp_dir, f"page_{page_num}.png")
+                image.save(image_path)
+                image_paths.append(image_path)
+            
+            list_path = os.path.join(tmp_dir, "pages.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(image_paths))
+            text = pytesseract.image_to_string(list_path)
+        
+        # Pages are separated by form feeds; Tesseract 4 also ends the last page with one
+        texts = text.split("\f")
+        if len(texts) == len(page_nums) + 1 and not texts[-1].strip():
+            texts.pop()
+        if len(texts) != len(page_nums):
+            raise ValueError(f"expected {len(page_nums)} pages of output, got {len(texts)}")
+        
+        logger.info(f"OCR extracted {sum(map(len, texts))} characters from {len(page_nums)} pages")
+        return texts
+        
+    except Exception as e:
+        logger.warning(f"Batched OCR failed ({e}), falling back to per-page OCR")
+        return [extract_pdf_page_with_ocr(file_path, page_num, pdf) for page_num in page_nums]
+
+
+def _ocr_image(image) -> str:
+    """Run Tesseract on a PIL image, in-process when tesserocr is installed."""
+    if TESSEROCR_AVAILABLE:
+        api = getattr(_ocr_local, "api", None)
+        if api is None:
+            try:
+                api = _ocr_local.api = tesserocr.PyTessBaseAPI()
+            except RuntimeError as e:  # e.g. tessdata not found
+                if pytesseract is None:
+                    raise
+                logger.warning(f"tesserocr unavailable ({e}), using pytesseract")
+                return pytesseract.image_to_string(image)
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(image)
+
+
+def _render_pdf_page(file_path: Path, page_num: int, pdf=None):
+    """
+    Render one page to a PIL image. PDFium renders in-process; pdf2image
+    spawns poppler's pdftoppm and round-trips the page through an image file.
+    """
+    if PDFIUM_AVAILABLE:
+        with _pdfium_lock:
+            doc = pdf if pdf is not None else pdfium.PdfDocument(str(file_path))
+            try:
+                page = doc[page_num]
+                image = page.render(scale=_OCR_RENDER_SCALE).to_pil()
+                page.close()
+                return image
+            finally:
+                if pdf is None:
+                    doc.close()
+    
+    images = convert_from_path(
+        str(file_path),
+        first_page=page_num + 1,
+        last_page=page_num + 1,
+        poppler_path=POPPLER_PATH
+    )
+    return images[0] if images else None
+
+
 def extract_text_from_json(file_path: Path) -> str:
     """
     Extract text from JSON file and format as readable text.
@@ -534,17 +995,44 @@ def extract_text_from_json(file_path: Path) -> str:
         Formatted JSON content as text
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Read bytes so orjson decodes UTF-8 itself, skipping the text wrapper
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
-        # Format JSON with indentation for readability
-        formatted = json.dumps(data, indent=2, ensure_ascii=False)
+        # Format JSON with indentation for readability (orjson keeps non-ASCII as-is)
+        formatted = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
         logger.info(f"Extracted JSON with {len(formatted)} characters")
         return formatted
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON file: {e}")
         return f"[Invalid JSON: {str(e)}]"
     except Exception as e:
         logger.exception("JSON extraction failed")
         return f"[JSON extraction error: {str(e)}]"
+
+
+def _read_text(file_path: Path) -> str:
+    """Read a plain text file (text, markdown, Python source)."""
+    return file_path.read_text(encoding="utf-8")
+
+
+def _file_digest(file_path: Path) -> str:
+    """BLAKE2b hex digest of a file's contents."""
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "blake2b").hexdigest()
+        h = hashlib.blake2b()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# Content type → extractor, used by _extract_text_from_file_sync
+_EXTRACTORS = {
+    "text/plain": _read_text,
+    "text/markdown": _read_text,
+    "text/x-python": _read_text,
+    "application/json": extract_text_from_json,
+    "application/pdf": extract_text_from_pdf,  # OCR fallback for pages without embedded text
+}
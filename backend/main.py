@@ -1,8 +1,13 @@
 import os
+import re
+import asyncio
+import hashlib
+import logging
 import subprocess
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import httpx
+import orjson
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from dotenv import load_dotenv
@@ -14,15 +19,14 @@ load_dotenv()
 from app.config import (
     APP_NAME, PROVIDER, OLLAMA_HOST, OPENAI_API_KEY,
     ALLOW_ORIGINS, DATABASE_PATH, BASE_DIR, LOGS_DIR, IS_PACKAGED,
+    CHROMA_DIR, UPLOAD_DIR,
     DEFAULT_OLLAMA_LLM_MODEL, DEFAULT_OPENAI_LLM_MODEL,
     DEFAULT_OLLAMA_EMBED_MODEL, DEFAULT_OPENAI_EMBED_MODEL,
-    runtime_config,
+    PROVIDER_PROFILES, runtime_config,
     logger as cfg_logger
 )
-from app.embeddings import LangChainEmbeddingManager
-from app.memory import Mem0MemoryManager
-from app.openai_client import EnhancedOpenAIClient
-from app.db_manager import create_db_and_tables
+import app.config as config_module
+from app.responses import ORJSONResponse
 
 # Import route modules
 from app.routes import dependencies
@@ -32,42 +36,203 @@ from app.routes.documents import router as documents_router
 from app.routes.chats import router as chats_router
 from app.routes.users import router as users_router
 from app.routes.admin import router as admin_router
-from app.routes.llamacpp_api import router as llamacpp_api_router
+from app.routes.llamacpp_api import router as llamacpp_api_router, stop_embed_batcher
 from app.routes.models import router as models_router
 
 # Use the logger from config
 logger = cfg_logger
 
+# Banner separator; grouped startup lines go out as one multi-line record
+SEP = "=" * 80
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Manage application lifecycle events (startup/shutdown).
-    Replaces deprecated @app.on_event decorators.
+
+async def _validate_ollama(app: FastAPI, detection_result: dict, errors: list, provider_lines: list) -> None:
+    """Check the detected Ollama server and the required models."""
+    logger.info("\n".join(provider_lines + [
+        f"Ollama Host: {OLLAMA_HOST}",
+        f"Ollama LLM Model: {DEFAULT_OLLAMA_LLM_MODEL}",
+        f"Ollama Embed Model: {DEFAULT_OLLAMA_EMBED_MODEL}",
+        SEP,
+    ]))
+
+    # Ollama was already started during detection, just verify models
+    if detection_result.get("started_by_us"):
+        logger.info("✅ Ollama started successfully during detection")
+    else:
+        logger.info("✅ Ollama already running")
+
+    if not detection_result.get("available"):
+        error_msg = "Ollama could not be started or verified"
+        logger.error(f"{error_msg}")
+        errors.append({
+            "component": "ollama",
+            "message": error_msg,
+            "suggestion": "Install Ollama from https://ollama.ai or start it manually with: ollama serve"
+        })
+        app.state.ollama_process = None
+    else:
+        # Ollama is running - store process reference if we started it
+        if detection_result.get("started_by_us"):
+            logger.info("✅ Started Ollama as background service\n"
+                        "   Ollama will be stopped when backend exits")
+            # Store process reference for cleanup on shutdown
+            app.state.ollama_process = detection_result.get("process")
+        else:
+            logger.info("✅ Ollama service is already running")
+            app.state.ollama_process = None  # Don't kill processes we didn't start
+
+        # One-shot version probe for the startup log; /api/tags and
+        # /api/version go out concurrently
+        from app.utils import check_ollama_health
+        health = await check_ollama_health(OLLAMA_HOST, want_version=True)
+        if health["available"]:
+            logger.info(f"   Ollama version: {health.get('version', 'unknown')}")
+
+        # Check for exact version match
+        available_models = detection_result.get("models", [])
+        required_models = [DEFAULT_OLLAMA_LLM_MODEL, DEFAULT_OLLAMA_EMBED_MODEL]
+        missing_models = [m for m in required_models if m not in available_models]
+
+        if missing_models:
+            error_msg = f"Required Ollama models not found: {missing_models}"
+            logger.warning(f"{error_msg}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Available models: {available_models}")
+            errors.append({
+                "component": "ollama_models",
+                "message": error_msg,
+                "suggestion": f"Pull missing models: {' and '.join([f'ollama pull {m}' for m in missing_models])}"
+            })
+        else:
+            logger.info(f"✅ All required Ollama models available: {required_models}")
+
+
+async def _validate_llamacpp(app: FastAPI, detection_result: dict, errors: list, provider_lines: list) -> None:
+    """Detect the GPU and check the LlamaCpp model files."""
+    logger.info("\n".join(provider_lines + [
+        f"Models Directory: {config_module.LLAMACPP_MODELS_DIR}",
+        f"Chat Model: {config_module.LLAMACPP_CHAT_MODEL}",
+        f"Embed Model: {config_module.LLAMACPP_EMBED_MODEL}",
+        SEP,
+    ]))
+
+    from app.gpu_detector import auto_detect_and_configure
+    from app.utils import check_ollama_health
+
+    chat_model_path = config_module.LLAMACPP_MODELS_DIR / config_module.LLAMACPP_CHAT_MODEL
+    embed_model_path = config_module.LLAMACPP_MODELS_DIR / config_module.LLAMACPP_EMBED_MODEL
+
+    # GPU auto-detection, model file checks and the Ollama probe (optional
+    # but recommended, for Mem0) are independent, so run them concurrently
+    logger.info("Detecting GPU and verifying LlamaCpp models...")
+    gpu_config, chat_model_exists, embed_model_exists, ollama_status = await asyncio.gather(
+        asyncio.to_thread(auto_detect_and_configure),
+        asyncio.to_thread(chat_model_path.exists),
+        asyncio.to_thread(embed_model_path.exists),
+        check_ollama_health(OLLAMA_HOST, timeout=2.0),
+    )
+    app.state.gpu_info = gpu_config  # Store for API endpoint
+
+    if not chat_model_exists:
+        error_msg = f"LlamaCpp chat model not found: {chat_model_path}"
+        logger.error(f"❌ {error_msg}")
+        errors.append({
+            "component": "llamacpp_chat_model",
+            "message": error_msg,
+            "suggestion": "Run: python scripts/download_models.py"
+        })
+    else:
+        logger.info(f"✅ Chat model found: {chat_model_path.name}")
+
+    if not embed_model_exists:
+        error_msg = f"LlamaCpp embed model not found: {embed_model_path}"
+        logger.error(f"❌ {error_msg}")
+        errors.append({
+            "component": "llamacpp_embed_model",
+            "message": error_msg,
+            "suggestion": "Run: python scripts/download_models.py"
+        })
+    else:
+        logger.info(f"✅ Embed model found: {embed_model_path.name}")
+
+    logger.info("\n".join([
+        "ℹ️  LlamaCpp will use internal OpenAI-compatible endpoints for Mem0",
+        "   Endpoints: /v1/completions, /v1/embeddings",
+        "   Mem0 will use custom provider factories (LlmFactory, EmbeddingFactory)",
+        f"   Ollama at {OLLAMA_HOST}: "
+        + ("reachable" if ollama_status["available"] else "not reachable (optional)"),
+    ]))
+
+    # Only set if detection spawned Ollama before falling back to this provider
+    app.state.ollama_process = detection_result.get("process")
+
+
+async def _validate_openai(app: FastAPI, detection_result: dict, errors: list, provider_lines: list) -> None:
+    """Check that an OpenAI API key is configured."""
+    logger.info("\n".join(provider_lines + [
+        f"OpenAI LLM Model: {DEFAULT_OPENAI_LLM_MODEL}",
+        f"OpenAI Embed Model: {DEFAULT_OPENAI_EMBED_MODEL}",
+        SEP,
+        "Verifying OpenAI API key...",
+    ]))
+
+    if not OPENAI_API_KEY or OPENAI_API_KEY == "":
+        error_msg = "OPENAI_API_KEY is not set in environment"
+        logger.error(f"❌ {error_msg}")
+        errors.append({
+            "component": "openai_api_key",
+            "message": error_msg,
+            "suggestion": "Set OPENAI_API_KEY in .env file"
+        })
+    else:
+        logger.info("✅ OpenAI API key configured")
+
+    # Only set if detection spawned Ollama before falling back to this provider
+    app.state.ollama_process = detection_result.get("process")
+
+
+# Per-provider startup validation, dispatched on the detected provider
+_PROVIDER_VALIDATORS = {
+    "ollama": _validate_ollama,
+    "llamacpp": _validate_llamacpp,
+    "openai": _validate_openai,
+}
+
+
+async def _deferred_init(app: FastAPI) -> None:
     """
-    # Import config to modify PROVIDER global
-    import app.config as config_module
-    from app.utils import detect_available_provider
+    Provider detection, validation and manager initialization.
     
-    # Startup: Initialize database and managers
-    logger.info("=" * 80)
-    logger.info("ElectronAIChat Backend Starting")
-    logger.info(f"Packaged: {IS_PACKAGED}")
-    logger.info(f"Base Directory: {BASE_DIR}")
-    logger.info(f"Logs Directory: {LOGS_DIR}")
+    Runs as a background task started by lifespan() so uvicorn binds its
+    socket immediately; app.state.ready flips to True once the managers are
+    set, and gated routes answer 503 until then.
+    """
+    from app.utils import detect_available_provider, load_provider_cache, save_provider_cache
+    from app.db_manager import ensure_db_schema
     
-    # Runtime provider detection with fallback logic
-    logger.info("=" * 80)
-    logger.info("🔍 Detecting available LLM provider...")
+    # SQLite schema check runs in a worker thread while the provider is detected
+    db_init = asyncio.create_task(asyncio.to_thread(ensure_db_schema))
     
+    # Startup: Initialize database and managers
     preferred_provider = None if config_module.PROVIDER_ENV == "auto" else config_module.PROVIDER_ENV
     
-    if preferred_provider:
-        logger.info(f"   User preference: {preferred_provider}")
-    else:
-        logger.info("   Auto-detection enabled (Ollama → llamacpp → OpenAI)")
+    # Runtime provider detection with fallback logic
+    logger.info("\n".join([
+        SEP,
+        "ElectronAIChat Backend Starting",
+        f"Packaged: {IS_PACKAGED}",
+        f"Base Directory: {BASE_DIR}",
+        f"Logs Directory: {LOGS_DIR}",
+        SEP,
+        "🔍 Detecting available LLM provider...",
+        f"   User preference: {preferred_provider}" if preferred_provider
+        else "   Auto-detection enabled (Ollama → llamacpp → OpenAI)",
+    ]))
     
-    detection_result = await detect_available_provider(preferred_provider)
+    # A detection from a restart moments ago is reused after a quick revalidation
+    detection_result = await load_provider_cache(preferred_provider)
+    if detection_result is None:
+        detection_result = await detect_available_provider(preferred_provider)
     
     # Update global PROVIDER with detected value
     detected_provider = detection_result["provider"]
@@ -78,140 +243,23 @@ async def lifespan(app: FastAPI):
     # Store Ollama process reference if we started it during detection
     ollama_process_ref = detection_result.get("process")
     
-    # Re-import to get updated PROVIDER in local scope
-    from app.config import PROVIDER
-    
-    logger.info(f"✅ Active LLM Provider: {PROVIDER}")
-    logger.info(f"   Reason: {detection_result['reason']}")
-    
+    provider_lines = [
+        f"✅ Active LLM Provider: {config_module.PROVIDER}",
+        f"   Reason: {detection_result['reason']}",
+    ]
     if detection_result.get("models"):
-        logger.info(f"   Available models: {len(detection_result['models'])}")
+        provider_lines.append(f"   Available models: {len(detection_result['models'])}")
+    provider_lines.append(SEP)
     
     # Validate provider configuration
     startup_errors = []
     
-    logger.info("=" * 80)
-    
-    if PROVIDER == "ollama":
-        logger.info(f"Ollama Host: {OLLAMA_HOST}")
-        logger.info(f"Ollama LLM Model: {DEFAULT_OLLAMA_LLM_MODEL}")
-        logger.info(f"Ollama Embed Model: {DEFAULT_OLLAMA_EMBED_MODEL}")
-        logger.info("=" * 80)
-        
-        # Ollama was already started during detection, just verify models
-        if detection_result.get("started_by_us"):
-            logger.info("✅ Ollama started successfully during detection")
-        else:
-            logger.info("✅ Ollama already running")
-        
-        if not detection_result.get("available"):
-            error_msg = "Ollama could not be started or verified"
-            logger.error(f"{error_msg}")
-            startup_errors.append({
-                "component": "ollama",
-                "message": error_msg,
-                "suggestion": "Install Ollama from https://ollama.ai or start it manually with: ollama serve"
-            })
-            app.state.ollama_process = None
-        else:
-            # Ollama is running - store process reference if we started it
-            if detection_result.get("started_by_us"):
-                logger.info("✅ Started Ollama as independent background service")
-                logger.info("   Ollama will be stopped when backend exits")
-                # Store process reference for cleanup on shutdown
-                app.state.ollama_process = detection_result.get("process")
-            else:
-                logger.info("✅ Ollama service is already running")
-                app.state.ollama_process = None  # Don't kill processes we didn't start
-            
-            # Check for exact version match
-            available_models = detection_result.get("models", [])
-            required_models = [DEFAULT_OLLAMA_LLM_MODEL, DEFAULT_OLLAMA_EMBED_MODEL]
-            missing_models = [m for m in required_models if m not in available_models]
-            
-            if missing_models:
-                error_msg = f"Required Ollama models not found: {missing_models}"
-                logger.warning(f"{error_msg}")
-                logger.info(f"Available models: {available_models}")
-                startup_errors.append({
-                    "component": "ollama_models",
-                    "message": error_msg,
-                    "suggestion": f"Pull missing models: {' and '.join([f'ollama pull {m}' for m in missing_models])}"
-                })
-            else:
-                logger.info(f"✅ All required Ollama models available: {required_models}")
-    
-    elif PROVIDER == "llamacpp":
-        from app.config import LLAMACPP_MODELS_DIR, LLAMACPP_CHAT_MODEL, LLAMACPP_EMBED_MODEL
-        
-        logger.info(f"Models Directory: {LLAMACPP_MODELS_DIR}")
-        logger.info(f"Chat Model: {LLAMACPP_CHAT_MODEL}")
-        logger.info(f"Embed Model: {LLAMACPP_EMBED_MODEL}")
-        logger.info("=" * 80)
-        
-        # GPU Auto-Detection
-        from app.gpu_detector import auto_detect_and_configure
-        gpu_config = auto_detect_and_configure()
-        app.state.gpu_info = gpu_config  # Store for API endpoint
-        
-        logger.info("Verifying LlamaCpp models...")
-        
-        chat_model_path = LLAMACPP_MODELS_DIR / LLAMACPP_CHAT_MODEL
-        embed_model_path = LLAMACPP_MODELS_DIR / LLAMACPP_EMBED_MODEL
-        
-        if not chat_model_path.exists():
-            error_msg = f"LlamaCpp chat model not found: {chat_model_path}"
-            logger.error(f"❌ {error_msg}")
-            startup_errors.append({
-                "component": "llamacpp_chat_model",
-                "message": error_msg,
-                "suggestion": "Run: python scripts/download_models.py"
-            })
-        else:
-            logger.info(f"✅ Chat model found: {chat_model_path.name}")
-        
-        if not embed_model_path.exists():
-            error_msg = f"LlamaCpp embed model not found: {embed_model_path}"
-            logger.error(f"❌ {error_msg}")
-            startup_errors.append({
-                "component": "llamacpp_embed_model",
-                "message": error_msg,
-                "suggestion": "Run: python scripts/download_models.py"
-            })
-        else:
-            logger.info(f"✅ Embed model found: {embed_model_path.name}")
-        
-        # Check if Ollama is available for Mem0 (optional but recommended)
-        from app.utils import check_ollama_health
-        ollama_status = await check_ollama_health(OLLAMA_HOST, timeout=2.0)
-        
-        logger.info("ℹ️  LlamaCpp will use internal OpenAI-compatible endpoints for Mem0")
-        logger.info("   Endpoints: /v1/completions, /v1/embeddings")
-        logger.info("   Mem0 will use custom provider factories (LlmFactory, EmbeddingFactory)")
-        
-        app.state.ollama_process = None  # No Ollama process to manage
-    
-    elif PROVIDER == "openai":
-        logger.info(f"OpenAI LLM Model: {DEFAULT_OPENAI_LLM_MODEL}")
-        logger.info(f"OpenAI Embed Model: {DEFAULT_OPENAI_EMBED_MODEL}")
-        logger.info("=" * 80)
-        logger.info("Verifying OpenAI API key...")
-        
-        if not OPENAI_API_KEY or OPENAI_API_KEY == "":
-            error_msg = "OPENAI_API_KEY is not set in environment"
-            logger.error(f"❌ {error_msg}")
-            startup_errors.append({
-                "component": "openai_api_key",
-                "message": error_msg,
-                "suggestion": "Set OPENAI_API_KEY in .env file"
-            })
-        else:
-            logger.info("✅ OpenAI API key configured")
-        
-        app.state.ollama_process = None  # No Ollama process to manage
-    
+    validator = _PROVIDER_VALIDATORS.get(config_module.PROVIDER)
+    if validator is not None:
+        await validator(app, detection_result, startup_errors, provider_lines)
     else:
-        error_msg = f"Unknown provider: {PROVIDER}"
+        logger.info("\n".join(provider_lines))
+        error_msg = f"Unknown provider: {config_module.PROVIDER}"
         logger.error(f"❌ {error_msg}")
         startup_errors.append({
             "component": "provider",
@@ -222,25 +270,31 @@ async def lifespan(app: FastAPI):
     
     # Log startup validation results
     if startup_errors:
-        logger.warning("=" * 80)
-        logger.warning("STARTUP VALIDATION WARNINGS:")
+        warning_lines = [SEP, "STARTUP VALIDATION WARNINGS:"]
         for error in startup_errors:
-            logger.warning(f"  • [{error['component']}] {error['message']}")
-            logger.warning(f"    → {error['suggestion']}")
-        logger.warning("=" * 80)
-        logger.warning("Backend will start but may fail at runtime. Fix issues above.")
-        logger.warning("=" * 80)
+            warning_lines.append(f"  • [{error['component']}] {error['message']}")
+            warning_lines.append(f"    → {error['suggestion']}")
+        warning_lines += [SEP, "Backend will start but may fail at runtime. Fix issues above.", SEP]
+        logger.warning("\n".join(warning_lines))
+    
+    logger.info("\n".join([
+        f"Database: {DATABASE_PATH}",
+        f"ChromaDB: {CHROMA_DIR}",
+        f"Upload Directory: {UPLOAD_DIR}",
+    ]))
     
-    logger.info(f"Database: {DATABASE_PATH}")
-    logger.info(f"ChromaDB: {BASE_DIR / 'chroma_db'}")
-    logger.info(f"Upload Directory: {BASE_DIR / 'uploads'}")
+    # Heavy modules (LangChain, ChromaDB, Mem0) are imported here rather than
+    # at module level, so importing main.py alone stays cheap
+    from app.embeddings import LangChainEmbeddingManager
+    from app.memory import Mem0MemoryManager
+    from app.openai_client import EnhancedOpenAIClient
     
-    # Initialize database (create tables on startup)
-    create_db_and_tables()
+    # Database must be ready before the managers are handed to routes
+    await db_init
     
     # Initialize shared managers (single instances)
     try:
-        if PROVIDER == "llamacpp":
+        if config_module.PROVIDER == "llamacpp":
             # For llamacpp, use lazy initialization via dependencies
             # This avoids import errors if llama-cpp-python is not installed
             logger.info("LlamaCpp provider selected - using lazy initialization")
@@ -248,24 +302,26 @@ async def lifespan(app: FastAPI):
             openai_client = None  # Will be lazy-loaded
         else:
             # Standard initialization for ollama/openai
-            langchain_manager = LangChainEmbeddingManager(provider=PROVIDER)
+            langchain_manager = LangChainEmbeddingManager(provider=config_module.PROVIDER)
             
             # Initialize OpenAI client based on provider
-            if PROVIDER == "ollama":
+            if config_module.PROVIDER == "ollama":
                 openai_client = EnhancedOpenAIClient(
                     base_url=OLLAMA_HOST,
                     api_key="ollama",
-                    provider="ollama"
+                    provider="ollama",
+                    profile=PROVIDER_PROFILES["ollama"]
                 )
             else:
                 openai_client = EnhancedOpenAIClient(
                     base_url="https://api.openai.com/v1",
                     api_key=OPENAI_API_KEY,
-                    provider="openai"
+                    provider="openai",
+                    profile=PROVIDER_PROFILES["openai"]
                 )
     except Exception as e:
         logger.error(f"Failed to initialize LangChain manager: {e}")
-        if PROVIDER == "ollama" and not any(err["component"] == "ollama" for err in startup_errors):
+        if config_module.PROVIDER == "ollama" and not any(err["component"] == "ollama" for err in startup_errors):
             logger.error("This usually means Ollama is not running or models are not available")
         raise
     
@@ -278,28 +334,80 @@ async def lifespan(app: FastAPI):
         openai_client=openai_client
     )
     
-    logger.info("All managers initialized successfully")
-    logger.info("=" * 80)
+    logger.info(f"All managers initialized successfully\n{SEP}")
+    
+    # Remember a detection that led to a clean start
+    if not startup_errors:
+        save_provider_cache(preferred_provider, detection_result)
     
     # Store startup errors in app state for health endpoint
     app.state.startup_errors = startup_errors
+    app.state.ready = True
+
+
+async def _run_deferred_init(app: FastAPI) -> None:
+    """Run _deferred_init, recording a failure instead of losing it in the task."""
+    try:
+        await _deferred_init(app)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.exception("Backend initialization failed")
+        app.state.startup_failure = str(e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage application lifecycle events (startup/shutdown).
+    Replaces deprecated @app.on_event decorators.
+    """
+    
+    # Readiness state read by /api/health/ready and the route gate
+    app.state.ready = False
+    app.state.startup_errors = []
+    app.state.startup_failure = None
+    app.state.ollama_process = None
+    
+    # Shared Ollama HTTP client (keep-alive connections reused across requests)
+    app.state.ollama_client = httpx.AsyncClient(
+        base_url=OLLAMA_HOST,
+        timeout=5.0,
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=30.0,
+        ),
+    )
+    
+    # Heavy startup runs in the background; the server accepts connections now
+    init_task = asyncio.create_task(_run_deferred_init(app))
     
     # Yield control to application (runs while app is active)
     yield
     
     # Shutdown: Cleanup resources
-    logger.info("=" * 80)
-    logger.info("ElectronAIChat Backend Shutting Down")
+    logger.info(f"{SEP}\nElectronAIChat Backend Shutting Down")
+    
+    init_task.cancel()
+    await asyncio.gather(init_task, return_exceptions=True)
+    await stop_embed_batcher()
     
-    # Kill Ollama process if we started it
-    if PROVIDER == "ollama" and hasattr(app.state, 'ollama_process') and app.state.ollama_process:
+    await app.state.ollama_client.aclose()
+    from app.utils import close_http_client
+    await close_http_client()
+    
+    # Stop any Ollama process we started, whatever the current provider: a
+    # switch away from Ollama leaves it running, and its stderr pipe closes
+    # with this process
+    if app.state.ollama_process:
         logger.info("Stopping Ollama server (started by backend)...")
         from app.utils import stop_ollama_process
-        stop_ollama_process(app.state.ollama_process)
-    elif PROVIDER == "ollama":
+        await stop_ollama_process(app.state.ollama_process)
+    elif config_module.PROVIDER == "ollama":
         logger.info("ℹ️ Ollama was already running, leaving it active")
     
-    logger.info("=" * 80)
+    logger.info(SEP)
 
 
 # Initialize FastAPI application with lifespan handler
@@ -307,80 +415,106 @@ app = FastAPI(
     title=APP_NAME,
     description="Chat backend with RAG, ChromaDB vector storage, and memory integration",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=ALLOW_ORIGINS,
+    # One pattern compiled by Starlette and matched with re.fullmatch,
+    # equivalent to the exact-origin list
+    allow_origin_regex="|".join(re.escape(origin) for origin in ALLOW_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Register route modules
+# Register route modules. Routes that need the managers or the database
+# answer 503 until deferred startup finishes (health gates its own routes)
+ready_gate = [Depends(dependencies.require_ready)]
 app.include_router(health_router)
-app.include_router(chat_router)
-app.include_router(documents_router)
-app.include_router(chats_router)
-app.include_router(users_router)
-app.include_router(admin_router)
-app.include_router(models_router)
+app.include_router(chat_router, dependencies=ready_gate)
+app.include_router(documents_router, dependencies=ready_gate)
+app.include_router(chats_router, dependencies=ready_gate)
+app.include_router(users_router, dependencies=ready_gate)
+app.include_router(admin_router, dependencies=ready_gate)
+app.include_router(models_router, dependencies=ready_gate)
 
 # Register internal llamacpp API (for Mem0 custom provider)
 app.include_router(llamacpp_api_router)
 
+# Static payloads, serialized once at import instead of on every poll
+_STATUS_PAYLOAD = orjson.dumps({"status": "Backend is running"})
+_ROOT_PAYLOAD = orjson.dumps({
+    "message": APP_NAME,
+    "version": "2.0.0",
+    "features": {
+        "embeddings": "LangChain",
+        "memory": "Mem0 (with fallback)",
+        "database": "SQLite (SQLModel)",
+        "vector_storage": "ChromaDB",
+        "provider": PROVIDER,
+        "streaming": True,
+        "rag": True,
+        "ocr": True,
+        "json_processing": True,
+        "persistence": True
+    },
+    "persistence": {
+        "chat_history": "SQLite",
+        "messages": "SQLite", 
+        "document_metadata": "SQLite",
+        "document_files": "Temporary (cleaned after processing)",
+        "embeddings": "ChromaDB",
+        "memories": "Mem0 (ChromaDB)"
+    },
+    "endpoints": {
+        "status": "/api/status",
+        "health": "/api/health",
+        "chat_stream": "/api/chat/stream",
+        "documents_upload": "/documents/upload",
+        "users_create": "/api/users/create",
+        "user_by_username": "/api/users/{username}",
+        "chats": "/api/chats/{user_id}",
+        "chats_create": "/api/chats/create",
+        "chat_detail": "/api/chats/detail/{chat_id}"
+    }
+})
+_ROOT_ETAG = f'"{hashlib.sha1(_ROOT_PAYLOAD).hexdigest()}"'
+_ROOT_HEADERS = {"ETag": _ROOT_ETAG, "Cache-Control": "public, max-age=60"}
+
+
 #TODO remove this endpoint later
 # Legacy status endpoint (for backward compatibility with Electron)
 @app.get("/api/status")
-def status():
-    return JSONResponse({"status": "Backend is running"})
+async def status():
+    return Response(content=_STATUS_PAYLOAD, media_type="application/json")
 
 
 @app.get("/", tags=["root"])
-async def root():
+async def root(request: Request):
     """Root endpoint providing API overview and system information."""
-    return {
-        "message": APP_NAME,
-        "version": "2.0.0",
-        "features": {
-            "embeddings": "LangChain",
-            "memory": "Mem0 (with fallback)",
-            "database": "SQLite (SQLModel)",
-            "vector_storage": "ChromaDB",
-            "provider": PROVIDER,
-            "streaming": True,
-            "rag": True,
-            "ocr": True,
-            "json_processing": True,
-            "persistence": True
-        },
-        "persistence": {
-            "chat_history": "SQLite",
-            "messages": "SQLite", 
-            "document_metadata": "SQLite",
-            "document_files": "Temporary (cleaned after processing)",
-            "embeddings": "ChromaDB",
-            "memories": "Mem0 (ChromaDB)"
-        },
-        "endpoints": {
-            "status": "/api/status",
-            "health": "/api/health",
-            "chat_stream": "/api/chat/stream",
-            "documents_upload": "/documents/upload",
-            "users_create": "/api/users/create",
-            "user_by_username": "/api/users/{username}",
-            "chats": "/api/chats/{user_id}",
-            "chats_create": "/api/chats/create",
-            "chat_detail": "/api/chats/detail/{chat_id}"
-        }
-    }
+    # Pollers that already hold this payload get an empty 304
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _ROOT_ETAG in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=_ROOT_HEADERS)
+    return Response(content=_ROOT_PAYLOAD, media_type="application/json", headers=_ROOT_HEADERS)
 
 
 if __name__ == "__main__":
+    import importlib.util
+    import sys
+    
     logger.info("Starting FastAPI server on http://127.0.0.1:8000")
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    server_kwargs = {"host": "127.0.0.1", "port": 8000}
+    # Pin the fast loop/parser from uvicorn[standard] instead of relying on
+    # auto-detection (uvloop has no Windows build; stay on asyncio there)
+    if importlib.util.find_spec("httptools"):
+        server_kwargs["http"] = "httptools"
+    if sys.platform != "win32" and importlib.util.find_spec("uvloop"):
+        server_kwargs["loop"] = "uvloop"
+    uvicorn.run(app, **server_kwargs)
     # For development with hot reload:
     # uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
 
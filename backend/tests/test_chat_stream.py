@@ -0,0 +1,87 @@
+# tests/test_chat_stream.py
+"""
+Client-disconnect behaviour of the SSE keep-alive wrapper used by /api/chat/stream.
+
+Run from backend/: python -m unittest discover -s tests -t .
+"""
+import asyncio
+import unittest
+
+from fastapi.responses import StreamingResponse
+
+from app.routes.chat import _with_keepalive
+
+
+class KeepaliveDisconnectTest(unittest.IsolatedAsyncioTestCase):
+
+    async def _serve(self, body, disconnect_after: int):
+        """
+        Drive a StreamingResponse the way uvicorn does for ASGI spec 2.3:
+        Starlette listens for http.disconnect and cancels the streaming task.
+        """
+        sent = []
+        body_frames = asyncio.Event()
+
+        async def receive():
+            await body_frames.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            frames = [m for m in sent if m["type"] == "http.response.body" and m.get("body")]
+            if len(frames) >= disconnect_after:
+                body_frames.set()
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.3"}, "method": "POST", "path": "/"}
+        response = StreamingResponse(body, media_type="text/event-stream")
+        await response(scope, receive, send)
+        return sent
+
+    async def test_disconnect_mid_stream_closes_source(self):
+        state = {"closed": False}
+
+        async def generate():
+            try:
+                for i in range(1000):
+                    yield f"data: {i}\n\n"
+                    await asyncio.sleep(0.01)
+            finally:
+                # Async cleanup (like closing a provider stream) spans several
+                # loop iterations, outliving the first cancellation
+                await asyncio.sleep(0.05)
+                state["closed"] = True
+
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda _loop, context: errors.append(context))
+
+        await asyncio.wait_for(self._serve(_with_keepalive(generate(), interval=5.0), 3), 5.0)
+        # Give the source's cleanup a chance to finish
+        await asyncio.sleep(0.2)
+
+        self.assertTrue(state["closed"])
+        self.assertEqual(errors, [])
+
+    async def test_keepalive_and_frames_in_order(self):
+        async def generate():
+            yield "data: a\n\n"
+            await asyncio.sleep(0.05)
+            yield "data: b\n\n"
+
+        frames = [frame async for frame in _with_keepalive(generate(), interval=0.02)]
+        self.assertEqual(frames[0], "data: a\n\n")
+        self.assertEqual(frames[-1], "data: b\n\n")
+        self.assertIn(": keep-alive\n\n", frames)
+
+    async def test_source_error_propagates(self):
+        async def generate():
+            yield "data: a\n\n"
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            async for _ in _with_keepalive(generate(), interval=1.0):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()